@@ -1,35 +1,313 @@
 import os
+import gzip
+import hashlib
+import json
 import logging
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+import random
+import time
+import unicodedata
+from functools import partial, wraps
+from flask import Flask, Response, g, render_template, request, session, jsonify, send_file, flash, redirect, url_for
+from markupsafe import Markup
 from werkzeug.middleware.proxy_fix import ProxyFix
-from mod_generator import ModGenerator
+from mod_generator import (
+    ModGenerator, ModArchive, StreamingModArchive, SqliteIdStore, BUNDLE_FORMAT_VERSION, BUNDLE_DATE_TIME,
+    DEFAULT_COMPRESSION, compression_policy, new_timings
+)
+from mod_pack import PACK_CODECS, PACK_SUFFIX, StreamingModPack
+from artifact_store import ArtifactStore
+from bundle_cache import BundleCache
+from job_queue import JobQueue, QueueFull
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
+from profiler import RequestProfiler
+from log_config import configure_logging
+import io
 import tempfile
-import zipfile
-import shutil
 from datetime import datetime
+from urllib.parse import quote
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configure logging: level and format from the environment, written off the request thread
+configure_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    log_format=os.environ.get('LOG_FORMAT', 'text')
+)
+request_log = logging.getLogger('app.requests')
+# Fraction of requests summarized at INFO; slower ones are always logged
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
+LOG_SLOW_SECONDS = float(os.environ.get('LOG_SLOW_MS', 1000)) / 1000
 
 # Create the app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "fallback-secret-key-for-development")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
-# Initialize mod generator
-mod_gen = ModGenerator()
+# Initialize mod generator; IDs are leased from a shared SQLite file so
+# every gunicorn worker (and every restart) hands out unique IDs
+id_store_path = os.environ.get(
+    'ID_STORE_PATH', os.path.join(tempfile.gettempdir(), 'miniworld_mod_ids.sqlite3')
+)
+mod_gen = ModGenerator(
+    id_store=SqliteIdStore(id_store_path),
+    lease_size=int(os.environ.get('ID_LEASE_SIZE', 100)),
+    compact=os.environ.get('MOD_JSON_COMPACT', '').lower() in ('1', 'true', 'yes')
+)
+
+# Generated files and ZIPs kept for preview/download
+artifacts = ArtifactStore(
+    max_bytes=int(os.environ.get('ARTIFACT_MAX_BYTES', 64 * 1024 * 1024)),
+    max_items=int(os.environ.get('ARTIFACT_MAX_ITEMS', 1024)),
+    ttl=int(os.environ.get('ARTIFACT_TTL', 3600))
+)
+
+# Background executor for long bulk packs
+jobs = JobQueue(
+    max_workers=int(os.environ.get('JOB_WORKERS', 2)),
+    max_jobs=int(os.environ.get('JOB_MAX_JOBS', 1000)),
+    max_pending=int(os.environ.get('JOB_MAX_PENDING', 20))
+)
+
+# Deterministic (seeded) bundles, keyed by their generation inputs
+bundle_cache = BundleCache(
+    directory=os.environ.get(
+        'BUNDLE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'miniworld_bundle_cache')
+    ),
+    max_memory_bytes=int(os.environ.get('BUNDLE_CACHE_MEMORY_BYTES', 16 * 1024 * 1024)),
+    max_disk_bytes=int(os.environ.get('BUNDLE_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+)
+
+# ZIP compression per endpoint: ARCHIVE_COMPRESSION sets the default (store, fast,
+# deflate, max, lzma, zstd where available) and ARCHIVE_COMPRESSION_<ENDPOINT> overrides it
+ARCHIVE_COMPRESSION = {
+    endpoint: os.environ.get(
+        f'ARCHIVE_COMPRESSION_{endpoint.upper()}',
+        os.environ.get('ARCHIVE_COMPRESSION', DEFAULT_COMPRESSION)
+    )
+    for endpoint in ('generate', 'bundle', 'auto_generate', 'auto_generate_stream', 'generate_batch')
+}
+for compression in ARCHIVE_COMPRESSION.values():
+    compression_policy(compression)  # fail at startup on a typo
+
+# Latency histograms exposed at /metrics (per worker process)
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram(
+    'mod_request_seconds', 'Time from request start until the response body was sent', ('route',)
+)
+stage_seconds = metrics.histogram(
+    'mod_stage_seconds', 'Time spent in each generation stage', ('route', 'stage')
+)
+
+# On-demand profiling of single requests; disabled unless PROFILE_SECRET is set
+profiler = RequestProfiler(
+    secret=os.environ.get('PROFILE_SECRET'),
+    directory=os.environ.get(
+        'PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'miniworld_profiles')
+    ),
+    max_files=int(os.environ.get('PROFILE_MAX_FILES', 50))
+)
+
+
+def add_profile_headers(response, spec):
+    """Point the client at the profile that this request will produce"""
+    profile_id, profile_format = spec
+    response.headers['X-Profile-Id'] = profile_id
+    response.headers['X-Profile-Format'] = profile_format
+    response.headers['X-Profile-URL'] = url_for('download_profile', profile_id=profile_id)
+    return response
+
+
+def profile_if_requested(view):
+    """Run the view under the profiler when the request carries the profiling secret"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        spec = profiler.requested(request)
+        if spec is None:
+            return view(*args, **kwargs)
+        response = app.make_response(profiler.call(spec, view, *args, **kwargs))
+        return add_profile_headers(response, spec)
+    return wrapper
+
+
+def request_route():
+    """Route pattern for metric labels; unmatched URLs share one label"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def time_response_send(response):
+    """Record the send stage and total request time once the body is written"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    route = request_route()
+    method = request.method
+    handled = time.perf_counter()
+
+    def record():
+        finished = time.perf_counter()
+        stage_seconds.observe(finished - handled, route=route, stage='response_send')
+        request_seconds.observe(finished - started, route=route)
+        duration = finished - started
+        if duration >= LOG_SLOW_SECONDS or random.random() < LOG_SAMPLE_RATE:
+            request_log.info(
+                '%s %s %s %.1fms', method, route, response.status_code, duration * 1000,
+                extra={'route': route, 'method': method, 'status': response.status_code,
+                       'duration_ms': round(duration * 1000, 3), 'bytes': response.content_length}
+            )
+
+    response.call_on_close(record)
+    return response
+
+def build_seeded_bundle(id_value, copyid_value, author_value, item_name, seed, result_id):
+    """Return files, ZIP bytes and ETag for a deterministic bundle, from cache when possible
+
+    result_id is part of the inputs: bundles sharing one would collide in game.
+    """
+    etag = BundleCache.make_key(
+        version=BUNDLE_FORMAT_VERSION,
+        id=id_value,
+        copyid=copyid_value,
+        author=author_value,
+        name=item_name,
+        seed=seed,
+        result_id=result_id,
+        compact=mod_gen.compact,
+        compression=ARCHIVE_COMPRESSION['bundle']
+    )
+    
+    zip_data = bundle_cache.get(etag)
+    if zip_data is not None:
+        files = ModArchive.read_files(zip_data, encoding=None)
+        return {'files': files, 'zip_data': zip_data, 'etag': etag, 'cached': True}
+    
+    result = mod_gen.generate_files(
+        id_value=id_value,
+        copyid_value=copyid_value,
+        author_value=author_value,
+        item_name=item_name,
+        seed=seed,
+        result_id=result_id
+    )
+    if not result:
+        return None
+    
+    files = encode_files(result['files'])
+    archive = ModArchive(date_time=BUNDLE_DATE_TIME, compression=ARCHIVE_COMPRESSION['bundle'])
+    archive.add_files(files)
+    zip_data = archive.getvalue()
+    bundle_cache.put(etag, zip_data)
+    return {'files': files, 'zip_data': zip_data, 'etag': etag, 'cached': False}
+
+def encode_files(files):
+    """Encode generated (content, file_type) tuples to UTF-8 bytes, once"""
+    return {
+        filename: (content.encode('utf-8'), file_type)
+        for filename, (content, file_type) in files.items()
+    }
+
+def file_etags(files):
+    """Strong ETag for each encoded file"""
+    return {
+        filename: hashlib.sha1(data).hexdigest()
+        for filename, (data, file_type) in files.items()
+    }
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 256
+
+def compressed_json(payload, etag):
+    """JSON response with conditional request handling and gzip/brotli encoding"""
+    encoding = None
+    if brotli is not None and request.accept_encodings['br']:
+        encoding = 'br'
+    elif request.accept_encodings['gzip']:
+        encoding = 'gzip'
+    
+    # Each encoding is a different representation, so it gets its own ETag
+    etag = f'{etag}-{encoding}' if encoding else etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if len(body) < MIN_COMPRESS_SIZE:
+            encoding = None
+        elif encoding == 'br':
+            body = brotli.compress(body, quality=5)
+        elif encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=6)
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.content_encoding = encoding
+    
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.private = True
+    response.cache_control.max_age = artifacts.ttl
+    return response
+
+def artifact_size(file_data):
+    """Approximate bytes held by a stored generation result"""
+    size = len(file_data.get('zip_data', b''))
+    for content, file_type in file_data.get('files', {}).values():
+        size += len(content)
+    return size
+
+# Creature preselected in the dropdown
+DEFAULT_CREATURE = 4533
+
+# Rendered once per process: the <option> list and the page without flash messages
+page_cache = {}
+
+NOT_FOUND_PAGE = (
+    '<!DOCTYPE html><html lang="vi"><head><meta charset="UTF-8"><title>404</title></head>'
+    '<body><h1>404</h1><p>Không tìm thấy trang.</p><p><a href="/">Về trang chủ</a></p></body></html>'
+)
+
+def creature_options():
+    """<option> elements for the creature dropdown, rendered once"""
+    if 'creature_options' not in page_cache:
+        page_cache['creature_options'] = Markup(render_template(
+            'creature_options.html',
+            creatures=mod_gen.catalog.options,
+            selected=DEFAULT_CREATURE
+        ))
+    return page_cache['creature_options']
+
+def render_index():
+    """Render the main page, including any pending flash messages"""
+    return render_template('index.html', creature_options=creature_options())
 
 @app.route('/')
 def index():
     """Main page with the mod generator form"""
-    # Create sorted list of creatures for dropdown
-    creatures_list = []
-    for copy_id, name in sorted(mod_gen.creature_data.items()):
-        creatures_list.append((copy_id, name))
+    if session.get('_flashes'):
+        # Pending flash messages make this page specific to the visitor
+        response = Response(render_index(), mimetype='text/html')
+        response.cache_control.no_store = True
+        return response
+    
+    if 'index' not in page_cache:
+        body = render_index().encode('utf-8')
+        page_cache['index'] = (body, hashlib.sha1(body).hexdigest())
+    body, etag = page_cache['index']
     
-    return render_template('index.html', creatures=creatures_list)
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    # Always revalidate, so visitors with new flash messages get a fresh page
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/generate', methods=['POST'])
+@profile_if_requested
 def generate_mod():
     """Generate mod files and return download link"""
     try:
@@ -37,6 +315,8 @@ def generate_mod():
         id_value = request.form.get('id_value', type=int)
         creature_select = request.form.get('creature_select', type=int)
         author_value = request.form.get('author_value', '').strip()
+        # Optional seed turns on deterministic, cacheable output
+        seed = request.form.get('seed', '').strip() or None
         
         # Validation
         if not author_value:
@@ -52,68 +332,63 @@ def generate_mod():
             return redirect(url_for('index'))
         
         # Get creature name
-        item_name = mod_gen.creature_data.get(creature_select, 'Unknown Creature')
-        
-        # Generate files
-        result = mod_gen.generate_files(
-            id_value=id_value,
-            copyid_value=creature_select,
-            author_value=author_value,
-            item_name=item_name
-        )
+        with stage_seconds.time(route='/generate', stage='catalog_lookup'):
+            item_name = mod_gen.catalog.name(creature_select)
+        
+        if seed:
+            # Deterministic bundle, served from cache on repeat requests
+            result_id = request.form.get('result_id_value', type=int)
+            if not result_id:
+                return jsonify({'success': False, 'error': 'Result ID là bắt buộc khi dùng seed'}), 400
+            with stage_seconds.time(route='/generate', stage='seeded_bundle'):
+                result = build_seeded_bundle(
+                    id_value, creature_select, author_value, item_name, seed, result_id
+                )
+        else:
+            with stage_seconds.time(route='/generate', stage='id_allocation'):
+                result_id = mod_gen.result_id_allocator.reserve()
+            
+            # Generate files
+            with stage_seconds.time(route='/generate', stage='json_build'):
+                result = mod_gen.generate_files(
+                    id_value=id_value,
+                    copyid_value=creature_select,
+                    author_value=author_value,
+                    item_name=item_name,
+                    result_id=result_id
+                )
         
         if not result:
             flash('Failed to generate mod files', 'error')
             return redirect(url_for('index'))
         
-        # Create temporary directory for files
-        temp_dir = tempfile.mkdtemp(prefix='miniworld_mod_')
-        
-        # Create organized folder structure
-        folders = {
-            'actor': 'Actor',
-            'horse': 'Horse', 
-            'crafting': 'Crafting',
-            'item': 'Item'
-        }
-        
-        # Create subdirectories
-        for folder_name in folders.values():
-            os.makedirs(os.path.join(temp_dir, folder_name), exist_ok=True)
-        
-        # Write files to organized directories
-        file_paths = []
-        for filename, (content, file_type) in result['files'].items():
-            folder_name = folders.get(file_type, 'Other')
-            file_path = os.path.join(temp_dir, folder_name, filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            file_paths.append(file_path)
+        if seed:
+            files = result['files']
+            zip_data = result['zip_data']
+        else:
+            # Encode once; the ZIP, previews and single downloads share these bytes
+            with stage_seconds.time(route='/generate', stage='serialization'):
+                files = encode_files(result['files'])
+            
+            # Build ZIP in memory with organized folder structure
+            with stage_seconds.time(route='/generate', stage='archive_assembly'):
+                archive = ModArchive(compression=ARCHIVE_COMPRESSION['generate'])
+                archive.add_files(files)
+                zip_data = archive.getvalue()
         
-        # Create ZIP file with copyid + creature name
+        # Name ZIP file with copyid + creature name
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         # Clean creature name for filename (remove special characters)
         clean_name = ''.join(c for c in item_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
         clean_name = clean_name.replace(' ', '_')
         zip_filename = f'{creature_select}_{clean_name}.zip'
-        zip_path = os.path.join(tempfile.gettempdir(), zip_filename)
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in file_paths:
-                # Get relative path from temp_dir to maintain folder structure
-                relative_path = os.path.relpath(file_path, temp_dir)
-                zipf.write(file_path, relative_path)
-        
-        # Clean up temporary directory
-        shutil.rmtree(temp_dir)
-        
-        # Store both files and zip path for preview/download
-        session_key = f'files_{timestamp}'
         
         # Store file data and metadata
         file_data = {
-            'files': result['files'],
-            'zip_path': zip_path,
+            'files': files,
+            'etags': file_etags(files),
+            'zip_data': zip_data,
+            'etag': result.get('etag'),
             'metadata': {
                 'id_value': id_value,
                 'creature_select': creature_select,
@@ -124,28 +399,31 @@ def generate_mod():
             }
         }
         
-        app.config[session_key] = file_data
+        # Store both files and zip data for preview/download
+        session_key = artifacts.put('files', file_data, artifact_size(file_data))
         
-        flash(f'Tạo file mod thành công! Files: {", ".join(result["files"].keys())}', 'success')
+        flash(f'Tạo file mod thành công! Files: {", ".join(files.keys())}', 'success')
         
         return jsonify({
             'success': True,
             'session_key': session_key,
-            'files_generated': list(result['files'].keys()),
+            'files_generated': list(files.keys()),
             'file_details': [
                 {
                     'name': filename,
                     'type': file_type,
-                    'size': len(content)
+                    'size': len(data)
                 }
-                for filename, (content, file_type) in result['files'].items()
+                for filename, (data, file_type) in files.items()
             ],
             'metadata': file_data['metadata'],
+            'etag': file_data['etag'],
+            'cached': result.get('cached', False),
             'download_zip_url': url_for('download_zip', session_key=session_key)
         })
         
     except Exception as e:
-        app.logger.error(f'Error generating mod: {str(e)}')
+        app.logger.error('Error generating mod: %s', e)
         flash(f'Error generating mod: {str(e)}', 'error')
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -153,59 +431,77 @@ def generate_mod():
 def download_zip(session_key):
     """Download the generated ZIP file"""
     try:
-        file_data = app.config.get(session_key)
-        if not file_data or not os.path.exists(file_data['zip_path']):
+        file_data = artifacts.get(session_key)
+        if not file_data or 'zip_data' not in file_data:
             flash('File ZIP không tồn tại hoặc đã hết hạn', 'error')
             return redirect(url_for('index'))
         
-        zip_path = file_data['zip_path']
         filename = file_data['metadata']['zip_filename']
         
         return send_file(
-            zip_path,
+            io.BytesIO(file_data['zip_data']),
             as_attachment=True,
             download_name=filename,
-            mimetype='application/zip'
+            mimetype='application/zip',
+            etag=file_data.get('etag') or False
         )
         
     except Exception as e:
-        app.logger.error(f'Error downloading ZIP: {str(e)}')
+        app.logger.error('Error downloading ZIP: %s', e)
         flash(f'Lỗi tải file ZIP: {str(e)}', 'error')
         return redirect(url_for('index'))
 
 @app.route('/preview/<session_key>')
 def preview_files(session_key):
-    """Preview generated files"""
+    """Preview generated files: metadata for all, content only for ?file=<name>"""
     try:
-        file_data = app.config.get(session_key)
+        file_data = artifacts.get(session_key)
         if not file_data:
             return jsonify({'error': 'Session đã hết hạn'}), 404
         
-        files_info = []
-        for filename, (content, file_type) in file_data['files'].items():
-            files_info.append({
+        files = file_data.get('files', {})
+        requested = request.args.get('file')
+        if requested is not None and requested not in files:
+            return jsonify({'error': 'File không tồn tại'}), 404
+        
+        etags = file_data.get('etags', {})
+        files_info = [
+            {
                 'name': filename,
                 'type': file_type,
-                'size': len(content),
-                'content': content[:500] + '...' if len(content) > 500 else content,
-                'full_content': content
-            })
+                'size': len(data),
+                'etag': etags.get(filename)
+            }
+            for filename, (data, file_type) in files.items()
+        ]
         
-        return jsonify({
+        payload = {
             'success': True,
             'files': files_info,
             'metadata': file_data['metadata']
-        })
+        }
+        if requested is not None:
+            data, file_type = files[requested]
+            payload['file'] = {
+                'name': requested,
+                'type': file_type,
+                'size': len(data),
+                'content': data.decode('utf-8')
+            }
+        
+        # Stored artifacts never change, so the key and file name identify the body
+        etag = hashlib.sha1(f'{session_key}/{requested or ""}'.encode('utf-8')).hexdigest()
+        return compressed_json(payload, etag)
         
     except Exception as e:
-        app.logger.error(f'Error previewing files: {str(e)}')
+        app.logger.error('Error previewing files: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/download_single/<session_key>/<filename>')
 def download_single_file(session_key, filename):
     """Download a single file"""
     try:
-        file_data = app.config.get(session_key)
+        file_data = artifacts.get(session_key)
         if not file_data:
             flash('Session đã hết hạn', 'error')
             return redirect(url_for('index'))
@@ -214,141 +510,318 @@ def download_single_file(session_key, filename):
             flash('File không tồn tại', 'error')
             return redirect(url_for('index'))
         
-        content, file_type = file_data['files'][filename]
+        data, file_type = file_data['files'][filename]
         
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.json',
-            delete=False,
-            encoding='utf-8'
-        )
-        temp_file.write(content)
-        temp_file.close()
+        # Serve the stored bytes directly, with ETag and Range support
+        response = Response(data, mimetype='application/json')
+        response.headers.set('Content-Disposition', 'attachment', filename=filename)
+        response.set_etag(file_data['etags'][filename])
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
         
-        return send_file(
-            temp_file.name,
+    except Exception as e:
+        app.logger.error('Error downloading single file: %s', e)
+        flash(f'Lỗi tải file: {str(e)}', 'error')
+        return redirect(url_for('index'))
+
+@app.route('/bundle/<int:copyid>')
+def download_bundle(copyid):
+    """Download a deterministic bundle straight from the content-addressed cache"""
+    try:
+        id_value = request.args.get('id', type=int)
+        author_value = request.args.get('author', '').strip()
+        seed = request.args.get('seed', '').strip()
+        result_id = request.args.get('result_id', type=int)
+        
+        if copyid not in mod_gen.catalog:
+            return jsonify({'success': False, 'error': 'Thần thú không tồn tại'}), 404
+        if not id_value or not author_value or not seed or not result_id:
+            return jsonify({'success': False, 'error': 'id, author, seed và result_id là bắt buộc'}), 400
+        
+        item_name = mod_gen.catalog.name(copyid)
+        bundle = build_seeded_bundle(id_value, copyid, author_value, item_name, seed, result_id)
+        if not bundle:
+            return jsonify({'success': False, 'error': 'Failed to generate mod files'}), 500
+        
+        response = send_file(
+            io.BytesIO(bundle['zip_data']),
             as_attachment=True,
-            download_name=filename,
-            mimetype='application/json'
+            download_name=f'{copyid}_{id_value}.zip',
+            mimetype='application/zip',
+            etag=bundle['etag'],
+            max_age=86400
         )
+        # Same inputs always give the same bytes
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
         
     except Exception as e:
-        app.logger.error(f'Error downloading single file: {str(e)}')
-        flash(f'Lỗi tải file: {str(e)}', 'error')
-        return redirect(url_for('index'))
+        app.logger.error('Error downloading bundle: %s', e)
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/get_creature_info/<int:copyid>')
 def get_creature_info(copyid):
     """Get creature information by copy ID"""
-    creature_name = mod_gen.creature_data.get(copyid, 'Unknown Creature')
+    creature_name = mod_gen.catalog.name(copyid)
     return jsonify({'name': creature_name})
 
+# Streamed ZIPs go out in chunks of at least this many bytes (the first one at once)
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 64 * 1024))
+
+def stream_archive(results, archive, route, timings):
+    """Yield a StreamingModArchive's (or StreamingModPack's) bytes while results are written into it"""
+    try:
+        sent_first = False
+        for _ in results:
+            # Send the first creature right away, so time to first byte does not grow with the pack
+            if not sent_first or archive.pending >= STREAM_CHUNK_SIZE:
+                sent_first = True
+                yield archive.drain()
+        started = time.perf_counter()
+        tail = archive.finish()
+        timings['archive_assembly'] += time.perf_counter() - started
+        yield tail
+    except Exception as e:
+        # Headers are already sent; the client sees a truncated ZIP
+        app.logger.error('Error streaming archive: %s', e)
+        raise
+    for stage, seconds in timings.items():
+        stage_seconds.observe(seconds, route=route, stage=stage)
+
+def streaming_archive(archive_format, compression):
+    """Return (writer, file suffix, mimetype) for a streamed download
+
+    archive_format is "zip" (the default) or a mod pack codec, "mwpack"
+    meaning xz; packs are unpacked with python -m mod_pack.
+    """
+    if not archive_format or archive_format == 'zip':
+        return StreamingModArchive(compression=compression), '.zip', 'application/zip'
+    codec = 'xz' if archive_format == 'mwpack' else archive_format
+    if codec not in PACK_CODECS:
+        raise ValueError(f'Unknown format {archive_format!r}; choose from zip, mwpack, {", ".join(PACK_CODECS)}')
+    return StreamingModPack(codec=codec), PACK_SUFFIX, 'application/octet-stream'
+
+def zip_stream_response(body, download_name, spec=None, mimetype='application/zip'):
+    """Chunked ZIP (or pack) download with no Content-Length, profiled while streaming if spec is set"""
+    if spec is not None:
+        body = profiler.call_iter(spec, body)
+    response = Response(body, mimetype=mimetype)
+    # Same filename handling as send_file: ASCII fallback plus RFC 5987 for the rest
+    simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+    names = {'filename': simple}
+    if simple != download_name:
+        names['filename*'] = "UTF-8''" + quote(download_name, safe="!#$&+-.^_`|~")
+    response.headers.set('Content-Disposition', 'attachment', **names)
+    response.cache_control.no_store = True
+    if spec is not None:
+        add_profile_headers(response, spec)
+    return response
+
+# Largest number of mods accepted by one /generate_batch request
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 500))
+
+def parse_batch_mods(items):
+    """Turn [{"id": 5, "copyid": 4533}, [6, 4534], {"copyid": 4535}, ...] into (id or None, copyid) pairs
+
+    Copy IDs must be in the catalog and unique, since file names are derived from them.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError('Danh sách mods là bắt buộc')
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f'Tối đa {MAX_BATCH_SIZE} mods mỗi lần')
+    
+    mods = []
+    seen = set()
+    for number, item in enumerate(items, 1):
+        if isinstance(item, dict):
+            id_value, copy_id = item.get('id'), item.get('copyid')
+        elif isinstance(item, list) and len(item) == 2:
+            id_value, copy_id = item
+        else:
+            raise ValueError(f'Mod {number}: cần id và copyid')
+        if isinstance(id_value, bool) or isinstance(copy_id, bool):
+            raise ValueError(f'Mod {number}: id và copyid phải là số nguyên')
+        try:
+            id_value, copy_id = None if id_value is None else int(id_value), int(copy_id)
+        except (TypeError, ValueError):
+            raise ValueError(f'Mod {number}: id và copyid phải là số nguyên')
+        if id_value is not None and id_value <= 0:
+            raise ValueError(f'Mod {number}: id phải là số nguyên dương')
+        if copy_id not in mod_gen.catalog:
+            raise ValueError(f'Mod {number}: thần thú {copy_id} không tồn tại')
+        if copy_id in seen:
+            raise ValueError(f'Mod {number}: copyid {copy_id} bị trùng')
+        seen.add(copy_id)
+        mods.append((id_value, copy_id))
+    return mods
+
+@app.route('/generate_batch', methods=['POST'])
+def generate_batch():
+    """Generate many mods from one JSON request and stream them back as a single ZIP"""
+    try:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({'success': False, 'error': 'Cần một JSON object'}), 400
+        author_value = str(payload.get('author') or '').strip()
+        if not author_value:
+            return jsonify({'success': False, 'error': 'Tên tác giả là bắt buộc'}), 400
+        try:
+            mods = parse_batch_mods(payload.get('mods'))
+            # ZIP compression is server policy; callers only choose between a ZIP and a pack
+            archive, suffix, mimetype = streaming_archive(
+                payload.get('format'), ARCHIVE_COMPRESSION['generate_batch']
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # IDs are assigned before streaming starts, so they can go in the headers
+        timings = new_timings()
+        planned = mod_gen.plan_many(mods, author_value, timings)
+        body = stream_archive(
+            mod_gen.write_jobs(planned, archive, timings=timings), archive, '/generate_batch', timings
+        )
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        response = zip_stream_response(
+            body, f'miniworld_batch_mod_{author_value}_{timestamp}{suffix}', profiler.requested(request), mimetype
+        )
+        response.headers['X-Mod-Count'] = str(len(planned))
+        # Ranges keep the headers short at any batch size: auto IDs go, in request
+        # order, to the mods sent without one, and result IDs follow request order
+        auto_ids = [job[0] for job, (id_value, _) in zip(planned, mods) if id_value is None]
+        if auto_ids:
+            response.headers['X-Auto-Id-Range'] = f'{auto_ids[0]}-{auto_ids[-1]}'
+        response.headers['X-Result-Id-Range'] = f'{planned[0][4]}-{planned[-1][4]}'
+        return response
+        
+    except Exception as e:
+        app.logger.error('Error in batch generate: %s', e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def run_auto_generate(job, author_value):
+    """Background job: generate the highest level pack and store its ZIP"""
+    # Generate files for highest level creatures only, pre-sorted by copy ID
+    with stage_seconds.time(route='/auto_generate', stage='catalog_lookup'):
+        highest_level_creatures = mod_gen.catalog.highest_level_options
+    archive = ModArchive(compression=ARCHIVE_COMPRESSION['auto_generate'])
+    bulk = mod_gen.generate_bulk(
+        highest_level_creatures,
+        author_value,
+        archive=archive,
+        progress=lambda done, total: job.update(done, total, archive.size)
+    )
+    total_files = bulk['total_files']
+    
+    # Finish ZIP file
+    started = time.perf_counter()
+    zip_data = archive.getvalue()
+    bulk['timings']['archive_assembly'] += time.perf_counter() - started
+    for stage, seconds in bulk['timings'].items():
+        stage_seconds.observe(seconds, route='/auto_generate', stage=stage)
+    job.update(job.done, job.total, len(zip_data))
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    zip_filename = f'miniworld_auto_mod_{author_value}_{timestamp}.zip'
+    
+    # Store auto generation data
+    auto_data = {
+        'zip_data': zip_data,
+        'total_files': total_files,
+        'total_creatures': len(mod_gen.catalog),
+        'metadata': {
+            'author_value': author_value,
+            'timestamp': timestamp,
+            'zip_filename': zip_filename
+        }
+    }
+    
+    # Store zip data for download
+    session_key = artifacts.put('auto_files', auto_data, artifact_size(auto_data))
+    
+    return {
+        'session_key': session_key,
+        'filename': zip_filename,
+        'total_files': total_files,
+        'total_creatures': len(highest_level_creatures)
+    }
+
+@app.route('/auto_generate/stream', methods=['POST'])
+def auto_generate_stream():
+    """Stream the highest level pack as a ZIP while it is being generated"""
+    author_value = (request.form.get('author_value') or '').strip()
+    if not author_value:
+        return jsonify({'success': False, 'error': 'Tên tác giả là bắt buộc'}), 400
+    try:
+        archive, suffix, mimetype = streaming_archive(
+            request.form.get('format'), ARCHIVE_COMPRESSION['auto_generate_stream']
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    timings = new_timings()
+    results = mod_gen.iter_bulk(mod_gen.catalog.highest_level_options, author_value, archive, timings=timings)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return zip_stream_response(
+        stream_archive(results, archive, '/auto_generate/stream', timings),
+        f'miniworld_auto_mod_{author_value}_{timestamp}{suffix}',
+        profiler.requested(request),
+        mimetype
+    )
+
 @app.route('/auto_generate', methods=['POST'])
 def auto_generate():
-    """Auto generate files for all creatures"""
+    """Queue auto generation for all creatures and return a job ID"""
     try:
         author_value = request.form.get('author_value', '').strip()
         
         if not author_value:
             return jsonify({'success': False, 'error': 'Tên tác giả là bắt buộc'})
         
-        # Create temporary directory for all files
-        temp_dir = tempfile.mkdtemp(prefix='miniworld_auto_mod_')
-        
-        # Create organized folder structure
-        folders = {
-            'actor': 'Actor',
-            'horse': 'Horse', 
-            'crafting': 'Crafting',
-            'item': 'Item'
-        }
-        
-        # Create subdirectories
-        for folder_name in folders.values():
-            os.makedirs(os.path.join(temp_dir, folder_name), exist_ok=True)
-        
-        # Generate files for highest level creatures only
-        current_id = mod_gen.auto_id_counter
-        total_files = 0
-        all_files = []
-        
-        # Get grouped creatures (highest level only)
-        highest_level_creatures = mod_gen.group_creatures_by_level()
-        
-        for copy_id, creature_name in sorted(highest_level_creatures.items()):
-            result = mod_gen.generate_files(
-                id_value=current_id,
-                copyid_value=copy_id,
-                author_value=author_value,
-                item_name=creature_name
-            )
-            
-            if result:
-                # Write files to organized directories
-                for filename, (content, file_type) in result['files'].items():
-                    folder_name = folders.get(file_type, 'Other')
-                    file_path = os.path.join(temp_dir, folder_name, filename)
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    all_files.append(file_path)
-                    total_files += 1
-                    
-                current_id += 1
-        
-        # Update auto counter
-        mod_gen.auto_id_counter = current_id
-        
-        # Create ZIP file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        zip_filename = f'miniworld_auto_mod_{author_value}_{timestamp}.zip'
-        zip_path = os.path.join(tempfile.gettempdir(), zip_filename)
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in all_files:
-                # Get relative path from temp_dir to maintain folder structure
-                relative_path = os.path.relpath(file_path, temp_dir)
-                zipf.write(file_path, relative_path)
-        
-        # Clean up temporary directory
-        shutil.rmtree(temp_dir)
-        
-        # Store zip path for download
-        session_key = f'auto_files_{timestamp}'
-        
-        # Store auto generation data
-        auto_data = {
-            'zip_path': zip_path,
-            'total_files': total_files,
-            'total_creatures': len(mod_gen.creature_data),
-            'metadata': {
-                'author_value': author_value,
-                'timestamp': timestamp,
-                'zip_filename': zip_filename
-            }
-        }
-        
-        app.config[session_key] = auto_data
-        
-        return jsonify({
+        # A profiled pack is profiled in the job thread, where the work happens
+        spec = profiler.requested(request)
+        task = run_auto_generate if spec is None else partial(profiler.call, spec, run_auto_generate)
+        try:
+            job = jobs.submit('auto_generate', task, author_value)
+        except QueueFull:
+            response = jsonify({'success': False, 'error': 'Máy chủ đang bận, vui lòng thử lại sau'})
+            response.status_code = 429
+            response.headers['Retry-After'] = '5'
+            return response
+        
+        response = jsonify({
             'success': True,
-            'session_key': session_key,
-            'filename': zip_filename,
-            'total_files': total_files,
-            'total_creatures': len(highest_level_creatures),
-            'download_url': url_for('download_zip', session_key=session_key)
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('job_status', job_id=job.id)
         })
+        response.status_code = 202
+        if spec is not None:
+            add_profile_headers(response, spec)
+        return response
         
     except Exception as e:
-        app.logger.error(f'Error in auto generate: {str(e)}')
+        app.logger.error('Error in auto generate: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report progress of a background job, with the download link once done"""
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job không tồn tại hoặc đã hết hạn'}), 404
+    
+    data = job.to_dict()
+    data['success'] = job.status != 'error'
+    if job.status == 'done':
+        data.update(job.result)
+        data['download_url'] = url_for('download_zip', session_key=job.result['session_key'])
+    
+    return jsonify(data)
+
 @app.route('/reset_counters', methods=['POST'])
 def reset_counters():
     """Reset auto ID counters to default values"""
     try:
-        mod_gen.auto_id_counter = 2
-        mod_gen.auto_result_id_counter = 4097
+        mod_gen.reset_counters()
         
         return jsonify({
             'success': True,
@@ -358,7 +831,7 @@ def reset_counters():
         })
         
     except Exception as e:
-        app.logger.error(f'Error resetting counters: {str(e)}')
+        app.logger.error('Error resetting counters: %s', e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/download_desktop')
@@ -372,26 +845,39 @@ def download_desktop():
             flash('Desktop tool không tìm thấy', 'error')
             return redirect(url_for('index'))
     except Exception as e:
-        app.logger.error(f'Error downloading desktop tool: {str(e)}')
+        app.logger.error('Error downloading desktop tool: %s', e)
         flash(f'Lỗi tải desktop tool: {str(e)}', 'error')
         return redirect(url_for('index'))
 
 
+@app.route('/profiles/<profile_id>')
+def download_profile(profile_id):
+    """Download a saved request profile; needs the profiling secret"""
+    found = profiler.find(profile_id) if profiler.authorized(request) else None
+    if found is None:
+        # Not cached: a profiled pack's profile appears once its job finishes
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    path, mimetype = found
+    return send_file(path, mimetype=mimetype, as_attachment=True,
+                     download_name=os.path.basename(path), max_age=0)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Latency histograms in the Prometheus text format"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.errorhandler(404)
 def not_found(error):
-    creatures_list = []
-    for copy_id, name in sorted(mod_gen.creature_data.items()):
-        creatures_list.append((copy_id, name))
-    return render_template('index.html', creatures=creatures_list), 404
+    response = Response(NOT_FOUND_PAGE, status=404, mimetype='text/html')
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
 
 @app.errorhandler(500)
 def internal_error(error):
-    app.logger.error(f'Internal error: {str(error)}')
+    app.logger.error('Internal error: %s', error)
     flash('An internal error occurred. Please try again.', 'error')
-    creatures_list = []
-    for copy_id, name in sorted(mod_gen.creature_data.items()):
-        creatures_list.append((copy_id, name))
-    return render_template('index.html', creatures=creatures_list), 500
+    return render_index(), 500
 
 if __name__ == '__main__':
     # Ensure temp directory exists
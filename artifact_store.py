@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class ArtifactStore:
+    """Size- and TTL-bounded LRU store for generated mod artifacts
+
+    Entries expire after ``ttl`` seconds without being accessed. Because every
+    access moves an entry to the back, the least recently used entry is also
+    the first one to expire, so expiry and eviction both pop from the front.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_items=1024, ttl=3600, on_evict=None):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, prefix, value, size):
+        """Store value and return a new collision-free key"""
+        key = f'{prefix}_{uuid.uuid4().hex}'
+        evicted = []
+        with self._lock:
+            self._items[key] = (value, size, time.monotonic() + self.ttl)
+            self.total_bytes += size
+            evicted.extend(self._expire())
+            # Always keep the newest entry, even if it alone exceeds max_bytes
+            while len(self._items) > 1 and (
+                len(self._items) > self.max_items or self.total_bytes > self.max_bytes
+            ):
+                evicted.append(self._pop_oldest())
+        self._notify(evicted)
+        return key
+
+    def get(self, key):
+        """Return the stored value, or None if it is missing or expired"""
+        evicted = []
+        with self._lock:
+            evicted.extend(self._expire())
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                value = None
+            else:
+                value, size, _ = entry
+                self._items[key] = (value, size, time.monotonic() + self.ttl)
+                self._items.move_to_end(key)
+                self.hits += 1
+        self._notify(evicted)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            evicted = list(self._items.values())
+            self._items.clear()
+            self.total_bytes = 0
+        self._notify([value for value, _, _ in evicted])
+
+    def stats(self):
+        """Return current counters for monitoring"""
+        with self._lock:
+            return {
+                'items': len(self._items),
+                'bytes': self.total_bytes,
+                'max_items': self.max_items,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _expire(self):
+        """Pop expired entries from the front; caller holds the lock"""
+        now = time.monotonic()
+        expired = []
+        while self._items:
+            _, (_, _, expires_at) = next(iter(self._items.items()))
+            if expires_at > now:
+                break
+            expired.append(self._pop_oldest())
+        return expired
+
+    def _pop_oldest(self):
+        _, (value, size, _) = self._items.popitem(last=False)
+        self.total_bytes -= size
+        self.evictions += 1
+        return value
+
+    def _notify(self, evicted):
+        if self.on_evict:
+            for value in evicted:
+                self.on_evict(value)
@@ -0,0 +1,148 @@
+"""
+ASGI entry point: serves the Flask app without a thread per client
+
+    uvicorn asgi:app
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+
+Requests are translated to WSGI and the Flask app runs on a bounded thread
+pool (ASGI_THREADS). Response bodies, including the streamed ZIPs and mod
+packs, are pulled from Flask one chunk at a time on that pool, and the next
+chunk is only produced after the server has accepted the previous one. A
+slow download therefore holds no thread while it waits on the network, and
+generation never runs ahead of the client by more than one chunk plus the
+server's write buffer. A client that disconnects stops its generation at the
+next chunk.
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app
+from log_config import stop_logging
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', min(32, (os.cpu_count() or 1) + 4)))
+
+_DONE = object()
+
+
+def _next_chunk(iterator):
+    return next(iterator, _DONE)
+
+
+class AsgiAdapter:
+    """Runs a WSGI app under an ASGI server, on a bounded executor"""
+
+    def __init__(self, wsgi_app, max_threads=ASGI_THREADS):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='asgi-worker')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self.handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.handle_lifespan(receive, send)
+
+    async def handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True, cancel_futures=True)
+                stop_logging()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle_http(self, scope, receive, send):
+        body = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        loop = asyncio.get_running_loop()
+        environ = self.build_environ(scope, b''.join(body))
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return lambda data: None
+
+        iterable = await loop.run_in_executor(self.executor, self.wsgi_app, environ, start_response)
+        try:
+            iterator = iter(iterable)
+            # Flask calls start_response before returning, so headers go out before any body work
+            await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+            while not disconnected.is_set():
+                chunk = await loop.run_in_executor(self.executor, _next_chunk, iterator)
+                if chunk is _DONE:
+                    await send({'type': 'http.response.body', 'body': b''})
+                    break
+                if chunk:
+                    # Returns once the server has room for more, which is the backpressure
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            watcher.cancel()
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, close)
+
+    @staticmethod
+    def build_environ(scope, body):
+        """WSGI environ for an ASGI http scope (PEP 3333 strings are latin-1)"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = 'HTTP_' + name
+            if key in environ:
+                # Split cookie headers (HTTP/2) rejoin with "; ", anything else with ","
+                separator = '; ' if key == 'HTTP_COOKIE' else ','
+                value = environ[key] + separator + value
+            environ[key] = value
+        return environ
+
+
+app = AsgiAdapter(flask_app)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the mod generator and the Flask routes
+
+    python benchmark.py -o results.json
+    python benchmark.py -o new.json --baseline results.json --threshold 0.2
+
+Results are saved as JSON. With --baseline, every benchmark whose mean time
+grew by more than the threshold is reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from mod_generator import (
+    CATALOG, COMPRESSION_POLICIES, CREATURE_DATA, CreatureCatalog, ModArchive, ModGenerator
+)
+from mod_pack import PACK_CODECS, ModPack
+
+# Each benchmark is timed over `repeat` samples; quick mode is for smoke runs
+FULL = {'repeat': 30, 'number': 200, 'requests': 200, 'packs': 12}
+QUICK = {'repeat': 5, 'number': 20, 'requests': 20, 'packs': 2}
+CONCURRENCY_LEVELS = (1, 4, 16)
+
+
+def summarize(samples, ops_per_sample=1):
+    """Turn per-sample durations (seconds) into per-operation statistics"""
+    per_op = sorted(sample / ops_per_sample for sample in samples)
+
+    def percentile(fraction):
+        return per_op[min(len(per_op) - 1, int(fraction * len(per_op)))]
+
+    mean = statistics.fmean(per_op)
+    return {
+        'samples': len(per_op),
+        'mean': mean,
+        'min': per_op[0],
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'ops_per_sec': 1 / mean if mean else 0
+    }
+
+
+def time_calls(func, repeat, number):
+    """Time `number` calls of func, `repeat` times"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, number)
+
+
+def bench_generate_files(settings):
+    mod_gen = ModGenerator()
+    name = CATALOG.name(4533)
+    return time_calls(
+        lambda: mod_gen.generate_files(2, 4533, 'benchmark', name),
+        settings['repeat'], settings['number']
+    )
+
+
+def bench_group_creatures(settings):
+    mod_gen = ModGenerator()
+    return time_calls(mod_gen.group_creatures_by_level, settings['repeat'], settings['number'])
+
+
+def bench_catalog_build(settings):
+    return time_calls(lambda: CreatureCatalog(CREATURE_DATA), settings['repeat'], max(1, settings['number'] // 10))
+
+
+def auto_pack_files():
+    """One auto pack worth of files, encoded as the app stores them"""
+    mod_gen = ModGenerator()
+    return [
+        {
+            filename: (content.encode('utf-8'), file_type)
+            for filename, (content, file_type) in mod_gen.generate_files(i, copy_id, 'benchmark', name)['files'].items()
+        }
+        for i, (copy_id, name) in enumerate(CATALOG.highest_level_options, 2)
+    ]
+
+
+def bench_zip_assembly(settings):
+    # Files are built once; only the archive is timed
+    packs = auto_pack_files()
+
+    def assemble():
+        archive = ModArchive()
+        for files in packs:
+            archive.add_files(files)
+        archive.getvalue()
+
+    return time_calls(assemble, settings['repeat'], 1)
+
+
+def bench_compression(settings, make_archive):
+    """CPU time and output size of one auto pack written by make_archive()"""
+    packs = auto_pack_files()
+    samples = []
+    for _ in range(settings['repeat']):
+        started = time.process_time()
+        archive = make_archive()
+        for files in packs:
+            archive.add_files(files)
+        size = len(archive.getvalue())
+        samples.append(time.process_time() - started)
+    stats = summarize(samples)
+    stats['bytes'] = size
+    stats['raw_bytes'] = sum(len(content) for files in packs for content, _ in files.values())
+    return stats
+
+
+def load_app():
+    """Import the Flask app against throwaway ID and cache storage"""
+    scratch = tempfile.mkdtemp(prefix='miniworld_bench_')
+    os.environ.setdefault('ID_STORE_PATH', os.path.join(scratch, 'ids.sqlite3'))
+    os.environ.setdefault('BUNDLE_CACHE_DIR', os.path.join(scratch, 'bundles'))
+    from app import app
+    logging.getLogger().setLevel(logging.WARNING)
+    return app
+
+
+def run_concurrent(app, concurrency, total, request):
+    """Spread `total` calls of request(client) over `concurrency` threads"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+
+    def worker(count):
+        client = app.test_client()
+        local = []
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                request(client)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread if count]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies)
+    stats['concurrency'] = concurrency
+    stats['requests'] = len(latencies)
+    stats['errors'] = len(errors)
+    stats['throughput'] = len(latencies) / elapsed if elapsed else 0
+    return stats
+
+
+def generate_request(client):
+    response = client.post('/generate', data={
+        'id_value': '2', 'creature_select': '4533', 'author_value': 'benchmark'
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f'/generate returned {response.status_code}')
+
+
+def auto_generate_request(client):
+    response = client.post('/auto_generate', data={'author_value': 'benchmark'})
+    if response.status_code != 202:
+        raise RuntimeError(f'/auto_generate returned {response.status_code}')
+    status_url = response.get_json()['status_url']
+    while True:
+        status = client.get(status_url).get_json()
+        if status['status'] == 'done':
+            return
+        if status['status'] == 'error':
+            raise RuntimeError(status['error'])
+        time.sleep(0.005)
+
+
+def run_benchmarks(settings, only=None):
+    """Run every benchmark (or those whose name starts with `only`)"""
+    benchmarks = [
+        ('generate_files', lambda: bench_generate_files(settings)),
+        ('group_creatures_by_level', lambda: bench_group_creatures(settings)),
+        ('catalog_build', lambda: bench_catalog_build(settings)),
+        ('zip_assembly', lambda: bench_zip_assembly(settings))
+    ]
+    for compression in COMPRESSION_POLICIES:
+        benchmarks.append((
+            f'compression_{compression}',
+            lambda c=compression: bench_compression(settings, lambda: ModArchive(compression=c))
+        ))
+    for codec in PACK_CODECS:
+        benchmarks.append((
+            f'pack_{codec}',
+            lambda c=codec: bench_compression(settings, lambda: ModPack(codec=c))
+        ))
+    app = None
+    for concurrency in CONCURRENCY_LEVELS:
+        benchmarks.append((
+            f'route_generate_c{concurrency}',
+            lambda c=concurrency: run_concurrent(app, c, settings['requests'], generate_request)
+        ))
+    for concurrency in CONCURRENCY_LEVELS:
+        benchmarks.append((
+            f'route_auto_generate_c{concurrency}',
+            lambda c=concurrency: run_concurrent(app, c, settings['packs'], auto_generate_request)
+        ))
+
+    results = {}
+    for name, bench in benchmarks:
+        if only and not name.startswith(only):
+            continue
+        if name.startswith('route_') and app is None:
+            app = load_app()
+        results[name] = bench()
+        print(format_result(name, results[name]), file=sys.stderr)
+    return results
+
+
+def format_result(name, stats):
+    line = f'{name:<28} mean {stats["mean"] * 1e6:>10.1f}us  p99 {stats["p99"] * 1e6:>10.1f}us'
+    if 'throughput' in stats:
+        line += f'  {stats["throughput"]:>8.1f} req/s'
+    if 'bytes' in stats:
+        line += f'  {stats["bytes"]:>9} bytes ({stats["bytes"] / stats["raw_bytes"]:.1%} of raw)'
+    return line
+
+
+def compare(results, baseline, threshold):
+    """Return (name, old mean, new mean) for every benchmark slower than threshold allows"""
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if not old or not old.get('mean'):
+            continue
+        if stats['mean'] > old['mean'] * (1 + threshold):
+            regressions.append((name, old['mean'], stats['mean']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the mod generator and Flask routes.')
+    parser.add_argument('-o', '--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against a previous results file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown of the mean before failing (default: %(default)s = 20%%)')
+    parser.add_argument('--quick', action='store_true', help='few iterations, for a smoke run')
+    parser.add_argument('--only', help='run only benchmarks whose name starts with this')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(QUICK if args.quick else FULL, args.only)
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'quick': args.quick
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    for name, old_mean, new_mean in regressions:
+        print(f'REGRESSION {name}: {old_mean * 1e6:.1f}us -> {new_mean * 1e6:.1f}us '
+              f'(+{(new_mean / old_mean - 1) * 100:.0f}%)', file=sys.stderr)
+    if regressions:
+        return 1
+    print(f'No regressions over {args.threshold:.0%} against {args.baseline}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
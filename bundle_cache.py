@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class BundleCache:
+    """Content-addressed cache of generated mod bundles
+
+    Entries are keyed by a hash of the generation inputs. The newest ones stay
+    in memory; entries pushed out of memory spill to files in directory, which
+    is itself bounded and evicted least recently used first. Several processes
+    may share the directory: files are written atomically and looked up by
+    name, so a bundle spilled by one worker is a hit for the others.
+    """
+
+    SUFFIX = '.zip'
+
+    def __init__(self, directory=None, max_memory_bytes=16 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(**inputs):
+        """Hash the generation inputs into a cache key (also used as the ETag)"""
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return cached bundle bytes, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            spilled = self._remember(key, data)
+        self._spill(spilled)
+        return data
+
+    def put(self, key, data):
+        """Store bundle bytes under key"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            spilled = self._remember(key, data)
+        self._spill(spilled)
+
+    def stats(self):
+        """Return current counters for monitoring"""
+        with self._lock:
+            return {
+                'memory_items': len(self._memory),
+                'memory_bytes': self.memory_bytes,
+                'disk_items': len(self._disk),
+                'disk_bytes': self.disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+    def _remember(self, key, data):
+        # Caller holds the lock; returns entries pushed out of memory
+        self._memory[key] = data
+        self.memory_bytes += len(data)
+        spilled = []
+        while len(self._memory) > 1 and self.memory_bytes > self.max_memory_bytes:
+            old_key, old_data = self._memory.popitem(last=False)
+            self.memory_bytes -= len(old_data)
+            spilled.append((old_key, old_data))
+        return spilled
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _spill(self, entries):
+        if not self.directory:
+            return
+        for key, data in entries:
+            with self._lock:
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                    continue
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, self._path(key))
+            except OSError:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                continue
+            with self._lock:
+                self._disk[key] = len(data)
+                self.disk_bytes += len(data)
+                evicted = self._trim_disk()
+            for old_key in evicted:
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def _trim_disk(self):
+        # Caller holds the lock
+        evicted = []
+        while len(self._disk) > 1 and self.disk_bytes > self.max_disk_bytes:
+            old_key, size = self._disk.popitem(last=False)
+            self.disk_bytes -= size
+            evicted.append(old_key)
+        return evicted
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(self.SUFFIX)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self.disk_bytes += size
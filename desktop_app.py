@@ -6,18 +6,24 @@ Based on the attached_assets/outu1_1752708098771.py file
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import json
 import uuid
 import random
 import string
 import os
 import threading
-import time
 import zipfile
 import tempfile
 import shutil
 from datetime import datetime
 
+from serializer import JsonSerializer
+
+# Same text as json.dumps(indent=2), via orjson when it is installed
+MOD_JSON = JsonSerializer(ensure_ascii=True)
+
+# Files written per creature, named {id}{suffix} (see FileGeneratorThread)
+FILE_SUFFIXES = ('.json', '_ride.json', '_crafting.json')
+
 class FileGeneratorThread(threading.Thread):
     def __init__(self, id_value, copyid_value, author_value, item_name, start_result_id, callback):
         super().__init__()
@@ -30,8 +36,6 @@ class FileGeneratorThread(threading.Thread):
         self.daemon = True
         
     def run(self):
-        time.sleep(0.5)
-        
         random_filename = ''.join(random.choices(string.digits, k=10))
         uuid_value = str(uuid.uuid4())
         
@@ -113,9 +117,9 @@ class FileGeneratorThread(threading.Thread):
             'author': self.author_value,
             'item_name': self.item_name,
             'files': {
-                f'{self.id_value}.json': json.dumps(main_mod_data, indent=2),
-                f'{self.id_value}_ride.json': json.dumps(ride_data, indent=2),
-                f'{self.id_value}_crafting.json': json.dumps(crafting_data, indent=2)
+                f'{self.id_value}.json': MOD_JSON.dumps(main_mod_data),
+                f'{self.id_value}_ride.json': MOD_JSON.dumps(ride_data),
+                f'{self.id_value}_crafting.json': MOD_JSON.dumps(crafting_data)
             }
         }
         
@@ -128,7 +132,8 @@ class CompactModGenerator:
         self.auto_id_counter = 2
         self.auto_result_id_counter = 4097
         self.folder_path = os.path.join(os.path.expanduser("~"), "Desktop")
-        self.last_generated_files = []
+        # Most recent batch as (folder, first ID, creature count); IDs are consecutive
+        self.last_batch = None
         
         self.load_creature_data()
         self.group_creatures_by_level()
@@ -405,19 +410,14 @@ class CompactModGenerator:
             self.progress.stop()
             
             # Create files
-            files_created = []
-            for filename, content in data['files'].items():
-                file_path = os.path.join(self.folder_path, filename)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                files_created.append(file_path)
+            files_created = self.write_mod_files(data)
             
             # Store for deletion
-            self.last_generated_files = files_created
+            self.last_batch = (self.folder_path, data['id'], 1)
             self.delete_btn.config(state=tk.NORMAL)
             
             # Update status
-            self.status_label.config(text=f"✅ Đã tạo {len(files_created)} files thành công!")
+            self.status_label.config(text=f"✅ Đã tạo {files_created} files thành công!")
             
             # Increment ID
             current_id = int(self.id_var.get())
@@ -425,7 +425,7 @@ class CompactModGenerator:
             
             # Show success message
             messagebox.showinfo("Thành công", 
-                               f"Đã tạo {len(files_created)} files cho {data['item_name']}")
+                               f"Đã tạo {files_created} files cho {data['item_name']}")
             
         except Exception as e:
             self.progress.stop()
@@ -442,6 +442,7 @@ class CompactModGenerator:
     
     def auto_generate_worker(self):
         """Worker thread for auto generation"""
+        current_id = None
         try:
             author_value = self.author_var.get().strip()
             if not author_value:
@@ -449,26 +450,27 @@ class CompactModGenerator:
                 return
             
             # Update UI
-            self.root.after(0, lambda: self.progress.start())
+            total_creatures = len(self.creature_groups)
+            self.root.after(0, lambda: self.progress.config(
+                mode='determinate', maximum=total_creatures, value=0))
             self.root.after(0, lambda: self.status_label.config(text="⏳ Đang tạo files tự động..."))
             
             current_id = self.auto_id_counter
-            files_created = []
+            self.last_batch = (self.folder_path, current_id, 0)
             
-            for copy_id, creature_name in self.creature_groups.items():
-                # Generate files for this creature
+            for done, (copy_id, creature_name) in enumerate(self.creature_groups.items(), 1):
+                # Generate files for this creature synchronously in this worker
                 thread = FileGeneratorThread(
                     current_id, copy_id, author_value, creature_name, 
                     self.auto_result_id_counter, self.auto_write_files_callback
                 )
-                thread.start()
-                thread.join()  # Wait for completion
-                
-                current_id += 1
+                thread.run()
                 
                 # Update progress
-                self.root.after(0, lambda: self.status_label.config(
-                    text=f"⏳ Đang tạo: {creature_name} (ID: {current_id-1})"))
+                self.root.after(0, lambda done=done, name=creature_name, id_value=current_id:
+                                self.auto_progress(done, total_creatures, name, id_value))
+                
+                current_id += 1
             
             # Update counter
             self.auto_id_counter = current_id
@@ -478,35 +480,70 @@ class CompactModGenerator:
                 len(self.creature_groups), len(self.creature_groups)))
             
         except Exception as e:
-            self.root.after(0, lambda: self.auto_error(str(e)))
+            if current_id is not None:
+                # The failed creature left no files, so the next run can reuse its ID
+                self.auto_id_counter = current_id
+            error_msg = str(e)
+            self.root.after(0, lambda: self.auto_error(error_msg))
     
     def auto_write_files_callback(self, data):
-        """Callback to write files during auto-generation"""
+        """Callback to write files during auto-generation
+
+        A write error stops the run, so last_batch always covers exactly the
+        creatures whose files were written.
+        """
+        self.write_mod_files(data)
+        
+        # Extend the current batch by one creature
+        folder_path, first_id, count = self.last_batch
+        self.last_batch = (folder_path, first_id, count + 1)
+    
+    def write_mod_files(self, data):
+        """Write one creature's files straight to the folder and return how many
+
+        If any file fails, the ones already written are removed again.
+        """
+        written = []
         try:
-            files_created = []
             for filename, content in data['files'].items():
                 file_path = os.path.join(self.folder_path, filename)
                 with open(file_path, 'w', encoding='utf-8') as f:
+                    written.append(file_path)
                     f.write(content)
-                files_created.append(file_path)
-            
-            # Add to last generated files
-            self.last_generated_files.extend(files_created)
-            
-        except Exception as e:
-            print(f"Error writing files: {e}")
+        except Exception:
+            for file_path in written:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            raise
+        return len(written)
+    
+    def iter_last_batch_files(self):
+        """Yield the paths written by the most recent batch"""
+        folder_path, first_id, count = self.last_batch
+        for id_value in range(first_id, first_id + count):
+            for suffix in FILE_SUFFIXES:
+                yield os.path.join(folder_path, f'{id_value}{suffix}')
+    
+    def auto_progress(self, done, total_creatures, creature_name, id_value):
+        """Show progress after each creature is written"""
+        self.progress.config(value=done)
+        self.status_label.config(
+            text=f"⏳ Đang tạo: {creature_name} (ID: {id_value}) - {done}/{total_creatures}")
     
     def auto_complete(self, success_count, total_creatures):
         """Handle auto generation completion"""
-        self.progress.stop()
+        self.progress.config(mode='indeterminate', value=0)
         self.delete_btn.config(state=tk.NORMAL)
         self.status_label.config(text=f"✅ Đã tạo {success_count}/{total_creatures} thần thú!")
         messagebox.showinfo("Hoàn thành", f"Đã tạo files cho {success_count} thần thú")
     
     def auto_error(self, error_msg):
         """Handle auto generation error"""
-        self.progress.stop()
+        self.progress.config(mode='indeterminate', value=0)
         self.status_label.config(text="❌ Lỗi khi tạo files tự động")
+        if self.last_batch and self.last_batch[2]:
+            # Creatures written before the error can still be deleted
+            self.delete_btn.config(state=tk.NORMAL)
         messagebox.showerror("Lỗi", f"Lỗi tạo files tự động: {error_msg}")
     
     def reset_auto_counters(self, event):
@@ -518,22 +555,22 @@ class CompactModGenerator:
     
     def delete_latest_files(self):
         """Delete files created in the most recent generation"""
-        if not self.last_generated_files:
+        if not self.last_batch or not self.last_batch[2]:
             messagebox.showwarning("Cảnh báo", "Không có files nào để xóa")
             return
         
         if not messagebox.askyesno("Xác nhận", 
-                                  f"Xóa {len(self.last_generated_files)} files cuối cùng?"):
+                                  f"Xóa {self.last_batch[2] * len(FILE_SUFFIXES)} files cuối cùng?"):
             return
         
         try:
             deleted_count = 0
-            for file_path in self.last_generated_files:
+            for file_path in self.iter_last_batch_files():
                 if os.path.exists(file_path):
                     os.remove(file_path)
                     deleted_count += 1
             
-            self.last_generated_files = []
+            self.last_batch = None
             self.delete_btn.config(state=tk.DISABLED)
             self.status_label.config(text=f"🗑️ Đã xóa {deleted_count} files")
             messagebox.showinfo("Thành công", f"Đã xóa {deleted_count} files")
@@ -0,0 +1,103 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit() when max_pending jobs are already queued or running"""
+
+
+class Job:
+    """Progress and outcome of one background job"""
+
+    def __init__(self, job_id, kind):
+        self.id = job_id
+        self.kind = kind
+        self.status = 'queued'
+        self.done = 0
+        self.total = 0
+        self.bytes_written = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def update(self, done, total, bytes_written=0):
+        """Record progress reported by the running job"""
+        self.done = done
+        self.total = total
+        self.bytes_written = bytes_written
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'error')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'done': self.done,
+            'total': self.total,
+            'bytes_written': self.bytes_written,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobQueue:
+    """Runs jobs on a local background thread pool and tracks their progress
+
+    Only the newest max_jobs jobs are kept; once over the limit the oldest
+    finished jobs are forgotten. At most max_pending jobs may be queued or
+    running at once; submit() refuses more with QueueFull.
+    """
+
+    def __init__(self, max_workers=2, max_jobs=1000, max_pending=20):
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mod-job')
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind, func, *args, **kwargs):
+        """Queue func(job, *args, **kwargs); its return value becomes job.result"""
+        job = Job(uuid.uuid4().hex, kind)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFull(f'{self._pending} jobs already queued or running')
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._trim()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """Return the job with this ID, or None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, func, args, kwargs):
+        job.status = 'running'
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'error'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._pending -= 1
+
+    def _trim(self):
+        # Caller holds the lock
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
@@ -0,0 +1,79 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+# Attributes every LogRecord has; anything else came in through `extra`
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed with `extra`"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for an in-process queue that leaves formatting to the listener
+
+    The stock prepare() formats the whole record, traceback included, so it
+    can be pickled. Records here never leave the process, so only msg and
+    args are merged (args may be mutated later) and exc_info is kept for
+    the listener's formatter.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level='INFO', log_format='text', stream=None):
+    """Send every log record through a queue that a background thread writes out
+
+    Request threads only merge the message and enqueue the record; formatting
+    and I/O happen on the listener thread. log_format is "text" or "json". Calling this again
+    replaces the previous setup.
+    """
+    global _listener
+    if _listener is None:
+        atexit.register(stop_logging)
+    else:
+        stop_logging()
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    root.handlers[:] = [LocalQueueHandler(log_queue)]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
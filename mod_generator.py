@@ -1,20 +1,211 @@
+import argparse
+import csv
+import io
 import json
+import logging
+import re
 import uuid
 import random
 import string
 import os
+import sqlite3
+import sys
+import threading
 import time
+import zipfile
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from types import MappingProxyType
+
+from serializer import COMPACT, INDENTED
+
+logger = logging.getLogger(__name__)
+
+# Archive folder for each generated file type
+FOLDERS = {
+    'actor': 'Actor',
+    'horse': 'Horse',
+    'crafting': 'Crafting',
+    'item': 'Item'
+}
+FILE_TYPES = {folder_name: file_type for file_type, folder_name in FOLDERS.items()}
+
+# Bump whenever the generated file layout changes, so cached bundles are not reused
+BUNDLE_FORMAT_VERSION = 1
+# Entry timestamp for reproducible (deterministic mode) archives
+BUNDLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+# Archive compression policies: name -> (zipfile method, compresslevel).
+# "deflate" is zlib's default level and the historical output; lzma (and zstd
+# on Pythons whose zipfile supports it) are smaller but need a modern unzip,
+# so they are meant for internal transfers rather than players.
+COMPRESSION_POLICIES = {
+    'store': (zipfile.ZIP_STORED, None),
+    'fast': (zipfile.ZIP_DEFLATED, 1),
+    'deflate': (zipfile.ZIP_DEFLATED, None),
+    'max': (zipfile.ZIP_DEFLATED, 9),
+    'lzma': (zipfile.ZIP_LZMA, None)
+}
+if hasattr(zipfile, 'ZIP_ZSTANDARD'):
+    COMPRESSION_POLICIES['zstd'] = (zipfile.ZIP_ZSTANDARD, None)
+DEFAULT_COMPRESSION = 'deflate'
+
+
+def compression_policy(name):
+    """Return (zipfile method, compresslevel) for a policy name"""
+    try:
+        return COMPRESSION_POLICIES[name or DEFAULT_COMPRESSION]
+    except KeyError:
+        raise ValueError(
+            f'Unknown compression {name!r}; choose from {", ".join(COMPRESSION_POLICIES)}'
+        ) from None
+
+
+class ModArchive:
+    """ZIP builder for generated mod files, in memory unless given a target file"""
+
+    def __init__(self, date_time=None, target=None, compression=DEFAULT_COMPRESSION):
+        self.buffer = io.BytesIO() if target is None else target
+        self.compress_type, self.compresslevel = compression_policy(compression)
+        self.zipf = zipfile.ZipFile(
+            self.buffer, 'w', self.compress_type, compresslevel=self.compresslevel
+        )
+        # Fixed entry timestamps make the archive bytes reproducible
+        self.date_time = date_time
+        self.file_count = 0
+
+    def add_files(self, files):
+        """Write (content, file_type) tuples into their Actor/Horse/Crafting/Item folders"""
+        for filename, (content, file_type) in files.items():
+            folder_name = FOLDERS.get(file_type, 'Other')
+            name = f'{folder_name}/{filename}'
+            if self.date_time:
+                name = zipfile.ZipInfo(name, self.date_time)
+                name.external_attr = 0o600 << 16
+            self.zipf.writestr(name, content, self.compress_type, self.compresslevel)
+            self.file_count += 1
+
+    @property
+    def size(self):
+        """Compressed bytes written so far"""
+        return self.buffer.tell()
+
+    def getvalue(self):
+        """Finish the archive and return its bytes"""
+        self.zipf.close()
+        return self.buffer.getvalue()
+
+    def close(self):
+        """Finish the archive (the target file is left open)"""
+        self.zipf.close()
+
+    @staticmethod
+    def read_files(zip_data, encoding='utf-8'):
+        """Read an archive built by ModArchive back into (content, file_type) tuples
+
+        With encoding=None the contents are returned as raw bytes.
+        """
+        files = {}
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zipf:
+            for name in zipf.namelist():
+                folder_name, _, filename = name.partition('/')
+                content = zipf.read(name)
+                if encoding:
+                    content = content.decode(encoding)
+                files[filename] = (content, FILE_TYPES.get(folder_name, 'other'))
+        return files
+
+
+class ChunkSink:
+    """Write-only stream that can tell() but not seek(), collecting bytes until drained
+
+    zipfile notices that it cannot seek and writes every entry with a data
+    descriptor after its data, so nothing already written is ever revisited.
+    """
 
-class ModGenerator:
     def __init__(self):
-        self.creature_data = self.load_creature_data()
-        self.creature_groups = self.group_creatures_by_level()
-        self.auto_id_counter = 2
-        self.auto_result_id_counter = 4097
+        self.chunks = []
+        self.pending = 0
+        self.position = 0
 
-    def load_creature_data(self):
-        """Load creature data from the provided list"""
-        data = """01|3430|Khủng Long Hóa Thạch Thường|3431|Khủng Long Hóa Thạch|3432|Khủng Long Hóa Thạch Siêu Cấp
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.pending += len(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.pending = 0
+        return data
+
+
+class StreamingModArchive(ModArchive):
+    """ModArchive whose bytes are handed out while it is still being written
+
+    Call drain() between add_files() calls to take the finished part of the
+    ZIP, and finish() for the rest; only undrained bytes are held in memory.
+    """
+
+    def __init__(self, date_time=None, compression=DEFAULT_COMPRESSION):
+        super().__init__(date_time=date_time, target=ChunkSink(), compression=compression)
+
+    @property
+    def pending(self):
+        """Bytes written but not drained yet"""
+        return self.buffer.pending
+
+    def drain(self):
+        return self.buffer.drain()
+
+    def finish(self):
+        """Write the central directory and return the remaining bytes"""
+        self.zipf.close()
+        return self.buffer.drain()
+
+    def getvalue(self):
+        raise TypeError('StreamingModArchive is read with drain() and finish()')
+
+
+class ModDirectory:
+    """Writes generated mod files into Actor/Horse/Crafting/Item folders on disk"""
+
+    def __init__(self, root):
+        self.root = root
+        self.file_count = 0
+        self.size = 0
+        for folder_name in FOLDERS.values():
+            os.makedirs(os.path.join(root, folder_name), exist_ok=True)
+
+    def add_files(self, files):
+        """Write (content, file_type) tuples into their folders"""
+        for filename, (content, file_type) in files.items():
+            folder_name = FOLDERS.get(file_type, 'Other')
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            os.makedirs(os.path.join(self.root, folder_name), exist_ok=True)
+            with open(os.path.join(self.root, folder_name, filename), 'wb') as f:
+                f.write(content)
+            self.file_count += 1
+            self.size += len(content)
+
+    def close(self):
+        pass
+
+
+# Creature catalog: group|copyid|name|copyid|name|... ordered from lowest to highest level
+CREATURE_DATA = """01|3430|Khủng Long Hóa Thạch Thường|3431|Khủng Long Hóa Thạch|3432|Khủng Long Hóa Thạch Siêu Cấp
 02|3433|Sóc Bay Nhỏ|3434|Sóc Bay Nhanh Nhẹn|3435|Sóc Bay Láu Cá
 03|3436|Kỳ Lân|3437|Thần Kỳ Lân|3438|Kỳ Lân May Mắn
 04|3439|Chocobo|3440|Chocobo Thông Minh|3441|Chocobo Nghịch Ngợm
@@ -76,274 +267,797 @@ class ModGenerator:
 60|4668|Mầm Lá Ngọc|4669|Cành Du Dương|4670|Mộng Tuổi Thơ
 61|4672|Vỏ Sò Lấp Lánh|4673|Giấc Mộng Phù Quang|4674|Ánh Sao San Hô
 62|4682|Làn Mây Mộng Ảo|4683|Bóng Mộng Cảnh|4684|Làn Mây Tiên Cảnh"""
-        
-        creatures = {}
+
+
+class CreatureCatalog:
+    """Immutable, pre-indexed view of the creature catalog
+
+    Parsed once; every lookup afterwards is a dict or tuple access.
+    """
+
+    def __init__(self, data):
+        names = {}
+        by_name = {}
+        groups = {}
+        group_of = {}
+        highest_level = {}
+
         for line in data.strip().split('\n'):
             parts = line.split('|')
-            if len(parts) >= 3:
-                # Parse each creature variant
-                for i in range(1, len(parts), 2):
-                    if i + 1 < len(parts) and parts[i] and parts[i+1]:
-                        copy_id = int(parts[i])
-                        name = parts[i+1]
-                        creatures[copy_id] = name
-        
-        return creatures
+            if len(parts) < 3:
+                continue
+            # Position in line determines level (0, 1, 2...)
+            variants = []
+            for i in range(1, len(parts), 2):
+                if i + 1 < len(parts) and parts[i] and parts[i+1]:
+                    copy_id = int(parts[i])
+                    name = parts[i+1]
+                    names[copy_id] = name
+                    # Some names repeat across groups; keep the first copy ID
+                    by_name.setdefault(name, copy_id)
+                    group_of[copy_id] = parts[0]
+                    variants.append(copy_id)
+
+            if variants:
+                groups[parts[0]] = tuple(variants)
+                # Highest level is the last non-empty variant in the group
+                highest_level[variants[-1]] = names[variants[-1]]
+
+        self.names = MappingProxyType(names)
+        self.by_name = MappingProxyType(by_name)
+        self.groups = MappingProxyType(groups)
+        self.group_of = MappingProxyType(group_of)
+        self.highest_level = MappingProxyType(highest_level)
+        self.copy_ids = tuple(sorted(names))
+        self.highest_level_ids = tuple(sorted(highest_level))
+        # (copy_id, name) pairs sorted by copy ID, ready for dropdowns
+        self.options = tuple((copy_id, names[copy_id]) for copy_id in self.copy_ids)
+        self.highest_level_options = tuple(
+            (copy_id, names[copy_id]) for copy_id in self.highest_level_ids
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, copy_id):
+        return copy_id in self.names
+
+    def name(self, copy_id, default='Unknown Creature'):
+        """Return the creature name for a copy ID"""
+        return self.names.get(copy_id, default)
+
+    def copy_id(self, name):
+        """Return the copy ID for a creature name, or None"""
+        return self.by_name.get(name)
+
+    def variants(self, copy_id):
+        """Return all copy IDs in the same group, lowest level first"""
+        group = self.group_of.get(copy_id)
+        return self.groups[group] if group is not None else ()
+
+
+CATALOG = CreatureCatalog(CREATURE_DATA)
+
+
+class JsonTemplate:
+    """JSON document serialized once, with named holes for the variable fields
+
+    Holes are written as "@@field@@" string values. render() produces the same
+    text as serializer.dumps(document) with every hole replaced by the
+    matching value.
+    """
+
+    HOLE = re.compile(r'"@@(\w+)@@"')
+
+    def __init__(self, document, serializer=INDENTED):
+        parts = self.HOLE.split(serializer.dumps(document))
+        self.head = parts[0]
+        self.segments = tuple(zip(parts[1::2], parts[2::2]))
+        self.encode_value = serializer.dumps_value
+
+    def render(self, fields):
+        """Fill the holes from the fields mapping and return the JSON text"""
+        encode_value = self.encode_value
+        out = [self.head]
+        for field, literal in self.segments:
+            out.append(encode_value(fields[field]))
+            out.append(literal)
+        return ''.join(out)
+
+
+# Main mod file
+ACTOR_DOCUMENT = {
+    "PhysicsActor": [],
+    "avatarInfo": [],
+    "foreign_ids": [],
+    "mod_desc": {
+        "author": "@@author@@",
+        "filename": "@@filename@@",
+        "uuid": "@@uuid@@",
+        "version": "1"
+    },
+    "property": {
+        "copyid": "@@copyid@@",
+        "id": "@@id@@"
+    },
+    "set_ai": [{"name": "swimming", "priority": 1}]
+}
+
+# Ride file
+RIDE_DOCUMENT = {
+    "property": {
+        "id": "@@id@@",
+        "copyid": "@@copyid@@"
+    }
+}
+
+# Crafting file
+CRAFTING_DOCUMENT = {
+    "PhysicsActor": [],
+    "avatarInfo": [],
+    "foreign_ids": [
+        {
+            "id": "@@result_id@@",
+            "key": "@@key@@"
+        }
+    ],
+    "mod_desc": {
+        "author": "@@author@@",
+        "filename": "@@craft_filename@@",
+        "uuid": "@@uuid@@",
+        "version": "1"
+    },
+    "property": {
+        "CraftingItemID": 11000,
+        "copyid": "@@copyid@@",
+        "id": "@@craft_id@@",
+        "material_count1": 1,
+        "material_count2": 0,
+        "material_count3": 0,
+        "material_count4": 0,
+        "material_count5": 0,
+        "material_count6": 0,
+        "material_count7": 0,
+        "material_count8": 0,
+        "material_count9": 0,
+        "material_id1": 101,
+        "material_id2": 0,
+        "material_id3": 0,
+        "material_id4": 0,
+        "material_id5": 0,
+        "material_id6": 0,
+        "material_id7": 0,
+        "material_id8": 0,
+        "material_id9": 0,
+        "result_count": 1,
+        "result_id": "@@result_id@@",
+        "type": 0
+    }
+}
+
+# Item file
+ITEM_DOCUMENT = {
+    "PhysicsActor": {
+        "EditType": 2,
+        "ModelScale": 1,
+        "ShapeID": 0,
+        "ShapeVal1": 50,
+        "ShapeVal2": 0,
+        "ShapeVal3": 0
+    },
+    "avatarInfo": [],
+    "foreign_ids": [
+        {
+            "id": "@@result_id@@",
+            "key": "@@key@@"
+        }
+    ],
+    "itemskills": [
+        {
+            "ChargeTime": 1.5,
+            "ChargeType": 0,
+            "Cooldown": 5,
+            "Costs": [
+                {
+                    "CostTarget": 10100,
+                    "CostType": 1,
+                    "CostVal": 0
+                }
+            ],
+            "Functions": [
+                {
+                    "CallNum": 1,
+                    "Duration": 0,
+                    "IsFollow": 0,
+                    "MobID": "@@id@@"
+                }
+            ],
+            "RangeType": 0,
+            "RangeVal1": 1000,
+            "RangeVal2": 300,
+            "RangeVal3": 300,
+            "SkillType": 1,
+            "TargetCamp": 0,
+            "name": "feature_call_monster",
+            "priority": 0,
+            "templateid": 103
+        }
+    ],
+    "mod_desc": {
+        "author": "@@author@@",
+        "filename": "@@item_filename@@",
+        "uuid": "@@uuid@@",
+        "version": "1"
+    },
+    "property": {
+        "copyid": 10100,
+        "describe": "",
+        "icon": "*11653",
+        "id": "@@result_id@@",
+        "model": "*11653",
+        "name": "@@name@@",
+        "orignid": "@@result_id@@",
+        "stack_max": 1
+    }
+}
+
+MOD_DOCUMENTS = (ACTOR_DOCUMENT, RIDE_DOCUMENT, CRAFTING_DOCUMENT, ITEM_DOCUMENT)
+
+# (actor, ride, crafting, item) templates, keyed by compact
+TEMPLATES = {
+    False: tuple(JsonTemplate(document, INDENTED) for document in MOD_DOCUMENTS),
+    True: tuple(JsonTemplate(document, COMPACT) for document in MOD_DOCUMENTS)
+}
+
+
+def seeded_rng(seed, id_value, copyid_value, author_value, item_name, result_id):
+    """Return an RNG whose output depends only on the generation inputs"""
+    return random.Random(
+        f'{BUNDLE_FORMAT_VERSION}|{seed}|{id_value}|{copyid_value}|{author_value}|{item_name}|{result_id}'
+    )
+
+
+def build_mod_files(id_value, copyid_value, author_value, item_name, start_result_id, rng=None, compact=False):
+    """Build the four mod files for one creature with an already assigned result ID
+
+    With rng (see seeded_rng) the uuid and filenames come from it, so the same
+    inputs always produce the same files. compact writes the JSON without
+    indentation.
+    """
+    if rng is None:
+        rng = random
+    random_filename = ''.join(rng.choices(string.digits, k=10))
+    if rng is random:
+        uuid_value = str(uuid.uuid4())
+    else:
+        uuid_value = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    
+    key = f"{author_value}{uuid_value.replace('-', '')}{random_filename}"
+    fields = {
+        'id': id_value,
+        'copyid': copyid_value,
+        'author': author_value,
+        'uuid': uuid_value,
+        'filename': random_filename,
+        'craft_filename': ''.join(rng.choices(string.digits, k=10)),
+        'item_filename': ''.join(rng.choices(string.digits, k=10)),
+        'key': key,
+        'result_id': start_result_id,
+        'craft_id': start_result_id + 1,
+        'name': item_name
+    }
+    
+    actor, ride, crafting, item = TEMPLATES[compact]
+    generated_files = {
+        f"{copyid_value}du.json": (actor.render(fields), "actor"),
+        f"{copyid_value}duride.json": (ride.render(fields), "horse"),
+        f"craft{copyid_value}.json": (crafting.render(fields), "crafting"),
+        f"item{copyid_value}.json": (item.render(fields), "item")
+    }
+    
+    return {
+        'files': generated_files,
+        'uuid': uuid_value,
+        'random_filename': random_filename,
+        'id': id_value,
+        'copyid': copyid_value,
+        'author': author_value,
+        'item_name': item_name,
+        'result_id_used': start_result_id
+    }
+
+
+# Below this many creatures, worker start-up costs more than it saves
+BULK_PARALLEL_THRESHOLD = 2000
+BULK_CHUNK_SIZE = 256
+
+
+def plan_bulk(creatures, author_value, start_id, start_result_id):
+    """Assign consecutive ids and result_ids to (copy_id, name) pairs in input order
+
+    Jobs are (id, copyid, author, name, result_id) tuples, yielded lazily.
+    """
+    for i, (copy_id, name) in enumerate(creatures):
+        yield (start_id + i, copy_id, author_value, name, start_result_id + i)
+
+
+def iter_chunks(iterable, size):
+    """Yield lists of up to size items without materializing the iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _seed_worker():
+    # Forked workers inherit the parent's RNG state; reseed so filenames differ
+    random.seed()
+
+
+def _build_chunk(jobs, compact=False):
+    return [build_mod_files(*job, compact=compact) for job in jobs]
+
+
+def run_bulk(jobs, workers=None, compact=False):
+    """Yield build_mod_files() results for planned jobs, in job order
+
+    jobs may be any iterable, including a generator over millions of rows.
+    Large inputs are split into chunks and built on a process pool, with only
+    a few chunks in flight at a time; small ones are built inline.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    head = list(islice(jobs, BULK_PARALLEL_THRESHOLD))
+    if workers < 2 or len(head) < BULK_PARALLEL_THRESHOLD:
+        for job in chain(head, jobs):
+            yield build_mod_files(*job, compact=compact)
+        return
+    
+    chunks = iter_chunks(chain(head, jobs), BULK_CHUNK_SIZE)
+    del head
+    with ProcessPoolExecutor(max_workers=workers, initializer=_seed_worker) as pool:
+        # Results are taken in submission order regardless of which worker finishes first
+        pending = deque(
+            pool.submit(_build_chunk, chunk, compact) for chunk in islice(chunks, workers * 2)
+        )
+        while pending:
+            results = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(pool.submit(_build_chunk, chunk, compact))
+            yield from results
+
+
+class SqliteIdStore:
+    """Durable ID counters shared by every process that opens the same file
+
+    Each counter row keeps the next free ID and an epoch that is bumped on
+    reset, so workers can tell that their leased range is stale.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS id_counters ('
+                'name TEXT PRIMARY KEY, next_id INTEGER NOT NULL, epoch INTEGER NOT NULL)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _update(self, name, start, change):
+        with closing(self._connect()) as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute(
+                    'SELECT next_id, epoch FROM id_counters WHERE name = ?', (name,)
+                ).fetchone()
+                next_id, epoch = change(*(row or (start, 0)))
+                db.execute(
+                    'INSERT OR REPLACE INTO id_counters (name, next_id, epoch) VALUES (?, ?, ?)',
+                    (name, next_id, epoch)
+                )
+                db.execute('COMMIT')
+                return next_id, epoch
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+
+    def lease(self, name, count, start):
+        """Claim count consecutive IDs; return (first_id, epoch)"""
+        next_id, epoch = self._update(name, start, lambda next_id, epoch: (next_id + count, epoch))
+        return next_id - count, epoch
+
+    def reset(self, name, value):
+        """Restart a counter at value and invalidate every outstanding lease"""
+        return self._update(name, value, lambda next_id, epoch: (value, epoch + 1))
+
+    def state(self, name, start):
+        """Return (next_id, epoch) without claiming anything"""
+        with closing(self._connect()) as db:
+            row = db.execute(
+                'SELECT next_id, epoch FROM id_counters WHERE name = ?', (name,)
+            ).fetchone()
+        return row or (start, 0)
+
+
+class IdAllocator:
+    """Thread-safe counter that hands out contiguous ID blocks
+
+    The lock only guards an integer add, so callers never wait on each
+    other's generation work. With a store, IDs come from ranges of
+    lease_size leased from the store, which keeps them unique across
+    processes and restarts while most reservations stay in memory.
+    """
+
+    # Seconds between checks for a reset made by another process
+    EPOCH_CHECK_INTERVAL = 1.0
+
+    def __init__(self, start, store=None, name=None, lease_size=100):
+        self.start = start
+        self.store = store
+        self.name = name
+        self.lease_size = lease_size
+        self._next = start
+        self._end = None
+        self._epoch = None
+        self._pid = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, count=1):
+        """Reserve count consecutive IDs and return the first one"""
+        with self._lock:
+            if self.store is not None:
+                self._ensure_lease(count)
+            first = self._next
+            self._next += count
+            return first
+
+    def peek(self):
+        """Return the next ID that will be handed out"""
+        with self._lock:
+            if self.store is not None and not self._lease_valid():
+                return self.store.state(self.name, self.start)[0]
+            return self._next
+
+    def reset(self, value=None):
+        """Restart from value (default: the initial start)"""
+        with self._lock:
+            value = self.start if value is None else value
+            if self.store is not None:
+                self.store.reset(self.name, value)
+                self._end = None
+            self._next = value
+            return value
+
+    def _lease_valid(self):
+        # A forked child must not keep handing out its parent's range
+        return self._end is not None and self._pid == os.getpid()
+
+    def _ensure_lease(self, count):
+        now = time.monotonic()
+        if self._lease_valid() and now - self._checked_at >= self.EPOCH_CHECK_INTERVAL:
+            self._checked_at = now
+            if self.store.state(self.name, self.start)[1] != self._epoch:
+                self._end = None
+
+        if not self._lease_valid() or self._next + count > self._end:
+            size = max(count, self.lease_size)
+            self._next, self._epoch = self.store.lease(self.name, size, self.start)
+            self._end = self._next + size
+            self._pid = os.getpid()
+            self._checked_at = now
+
+
+def new_timings():
+    """Seconds spent per generation stage, filled in by ModGenerator"""
+    return {'id_allocation': 0.0, 'json_build': 0.0, 'archive_assembly': 0.0}
+
+
+class ModGenerator:
+    DEFAULT_ID = 2
+    DEFAULT_RESULT_ID = 4097
+
+    def __init__(self, id_store=None, lease_size=100, compact=False):
+        self.catalog = CATALOG
+        # Write mod JSON without indentation
+        self.compact = compact
+        self.creature_data = self.load_creature_data()
+        self.creature_groups = self.group_creatures_by_level()
+        self.id_allocator = IdAllocator(
+            self.DEFAULT_ID, store=id_store, name='id', lease_size=lease_size
+        )
+        self.result_id_allocator = IdAllocator(
+            self.DEFAULT_RESULT_ID, store=id_store, name='result_id', lease_size=lease_size
+        )
+
+    @property
+    def auto_id_counter(self):
+        return self.id_allocator.peek()
+
+    @auto_id_counter.setter
+    def auto_id_counter(self, value):
+        self.id_allocator.reset(value)
+
+    @property
+    def auto_result_id_counter(self):
+        return self.result_id_allocator.peek()
+
+    @auto_result_id_counter.setter
+    def auto_result_id_counter(self, value):
+        self.result_id_allocator.reset(value)
+
+    def reset_counters(self):
+        """Reset the auto ID and Result ID counters to their defaults"""
+        self.id_allocator.reset()
+        self.result_id_allocator.reset()
+
+    def load_creature_data(self):
+        """Return the copy ID -> name mapping from the shared catalog"""
+        return self.catalog.names
     
     def group_creatures_by_level(self):
-        """Group creatures by their base name and return the highest level copy_id for each"""
-        data = """01|3430|Khủng Long Hóa Thạch Thường|3431|Khủng Long Hóa Thạch|3432|Khủng Long Hóa Thạch Siêu Cấp
-02|3433|Sóc Bay Nhỏ|3434|Sóc Bay Nhanh Nhẹn|3435|Sóc Bay Láu Cá
-03|3436|Kỳ Lân|3437|Thần Kỳ Lân|3438|Kỳ Lân May Mắn
-04|3439|Chocobo|3440|Chocobo Thông Minh|3441|Chocobo Nghịch Ngợm
-05|3442|Chú Voi Con|3443|Voi Vui Vẻ|3444|Voi Lễ Hội
-06|3445|Sư Tử Biển Thủy Thủ|3446|Sư Tử Biển Thuyền Trưởng|3447|Boss Sư Tử Biển
-07|3454|Mèo Thần Tài|3455|Mèo Phát Lộc|3456|Mèo Vũ Sư
-08|3457|Bạch Mã|3458|Thiên Mã|3459|Thần Mã
-09|3460|Kiệu Tre Cổ Điển|3461|Kiệu Vàng|3462|Kiệu Hoa Đào
-10|3469|Mộc Long Thần|3470|Hỏa Long Thần|3471|Hắc Long Thần
-11|3478|Trăng Rằm|3479|Trăng Ngọc|3480|Tiên Trăng
-12|3483|Xe Tuần Lộc Gỗ|3484|Xe Tuần Lộc Vàng|3485|Xe Tuần Lộc Băng
-13|3487|Pony Motor|||
-14|3488|Bò May Mắn|||
-15|3490|Transcendent Peak|3491|Ngọn Lửa Phương Bắc|3492|Chân Trời Trôi Dạt
-16|3495|Bộ Bộ Liên Hoa|3496|Hoa Bay Tuyết Nhảy|3497|Kính Hoa Thủy Nguyệt
-17|4501|Hươu Trắng Nhạt|4502|Sắc Màu Nirvana|4503|Vua Hươu
-18|4505|Xe Bí Ngô Ma Thuật|4506|Xe Bí Ngô Hoàng Gia|4507|Xe Bí Ngô Cổ Tích
-19|4509|Chong Chóng|4510|Xoắn Ốc Ba Lá|
-20|4512|Thiên Nga Xám|4513|Thiên Nga Sao|4514|Thiên Nga Tiên
-21|4517|Máy Bay Chiến Đấu|4518|Diều Hâu Đen|
-22|4520|Cánh Phản Lực|4521|Diều Hâu Trắng|
-23|4523|Bánh Xe Sấm Sét|||
-24|4525|Boro Đại Dương|4526|Boro Đại Dương - Tiến Hóa|
-25|4528|Seadrake|4529|Seadrake - Phát Triển|
-26|4531|Rồng Đỏ Rực|4532|Rồng Vàng Kim|4533|Rồng Hư Không
-27|4535|Nhạc Hội Petite|4536|Fluttering Shadow|
-28|4539|Đêm Ả Rập|4540|Thảm Bay Ba Tư|4541|Thảm Ma Thuật Của Các Vì Sao
-29|4543|Cúc Cu|4544|Kim Thuật Sư Quạ|4545|Chim Cắt Chiến Đấu
-30|4547|Sóng Âm Mạnh Nhất|4548|Nhạc Điện Tử Vô Hạn|
-31|4550|Hoa Trong Mây|4551|Vũ Điệu Hoa Yunmeng|
-32|4553|Thủy Vân Du|4554|Túy Hoa Âm|
-33|4556|Cún Mochi|||
-34|4560|Hoàng Đế Colt Siêu Âm|4561|Hoàng Đế Colt Lục Hành|4562|Hoàng Đế Rồng
-35|4564|Tiểu Hổ|4565|Hổ Con Xuống Núi|4566|Hổ Uy Phong
-36|4572|Tinh Ngữ Tâm Nguyện|4573|Đèn Lồng|4574|Xuân Phong Yến Ngữ
-37|4576|Thuyền Sa Mạc|4577|Sứ Giả Ốc Đảo|4578|Thần Lạc Hoa Lệ
-38|4580|Giấc Mơ Hạnh Phúc|4581|Chân Dung|
-39|4583|Chìa Khóa Trục Ảnh|4584|Chìa Khóa Mộng Li|4585|Chìa Khóa Vũ Huy
-40|4587|Trường Kiếm Xích Tiêu|4588|Thánh Kiếm Hiên Viên|
-41|4590|Thời Gian Thư Giãn|4591|Thời Khắc Trẻ Thơ|4592|Thời Khắc Mộng Ảo
-42|4594|Tiểu Hồ Ly Đáng Yêu|4595|Hồ Ly Lanh Lợi|4596|Hồ Ly Ảo Ảnh
-43|4598|Xe Mui Trần Mèo Yêu|||
-44|4602|Sứ Giả Ốc Đảo|4603|Thần Lạc Hoa Lệ|
-45|4606|Xanh Biếc|4607|Tử Dạ|4608|Thiều Quang
-46|4610|Ánh Trăng Mật Ong|4611|Ngóng Nỗi Tương Tư|4612|Hoa Quế Trong Trăng
-47|4614|Chuông Tím Buồn|4615|Hồn Bướm Dạo Mộng|4616|Lời Linh Lan Trong Gió
-48|4618|Ván Lướt Sóng Phong|4619|Hành Động Phong Cực Hạn|
-49|4623|Bé Heo|4624|Heo Bay Lô Lô|4625|Heo Cyberpunk
-50|4628|Thỏ Ngọc Lưu Vân|4629|Thỏ Phúc Tới Nhà|
-51|4632|Hộp Bột Mịn|4633|Hộp Cất Giữ Sao|4634|Đôi Cánh Giấc Mơ
-52|4636|Tuyết Lưu Ly|4637|Băng Giá Nở Rộ|
-53|4644|Xe Biến hình Mini|||
-54|4646|Sách Lễ Mừng|||
-55|4648|Thú Lộc Cộc|||
-56|4650|Hương Bánh Đong Đưa|||
-57|4654|Bồng Bềnh|||
-58|4656|Ghế Tiểu Thư|||
-59|4664|Âm Thanh Diệu Kỳ|4665|Hộp Nhạc Theo Đuổi Ngôi Sao|4666|Ngôi Sao Âm Nhạc
-60|4668|Mầm Lá Ngọc|4669|Cành Du Dương|4670|Mộng Tuổi Thơ
-61|4672|Vỏ Sò Lấp Lánh|4673|Giấc Mộng Phù Quang|4674|Ánh Sao San Hô
-62|4682|Làn Mây Mộng Ảo|4683|Bóng Mộng Cảnh|4684|Làn Mây Tiên Cảnh"""
-        
-        highest_level_creatures = {}
-        for line in data.strip().split('\n'):
-            parts = line.split('|')
-            if len(parts) >= 3:
-                creatures_in_group = []
-                
-                # Parse each creature variant in the group
-                for i in range(1, len(parts), 2):
-                    if i + 1 < len(parts) and parts[i] and parts[i+1]:
-                        copy_id = int(parts[i])
-                        name = parts[i+1]
-                        creatures_in_group.append({
-                            'copyid': copy_id,
-                            'name': name,
-                            'position': i // 2  # Position in line determines level (0, 1, 2...)
-                        })
-                
-                if creatures_in_group:
-                    # Get the highest level (last non-empty) creature for this group
-                    highest_level = max(creatures_in_group, key=lambda x: x['position'])
-                    highest_level_creatures[highest_level['copyid']] = highest_level['name']
-        
-        return highest_level_creatures
+        """Return the highest level copy_id -> name for each creature group"""
+        return self.catalog.highest_level
 
-    def generate_files(self, id_value, copyid_value, author_value, item_name):
-        """Generate mod files synchronously"""
+    def generate_files(self, id_value, copyid_value, author_value, item_name, seed=None, result_id=None):
+        """Generate mod files synchronously
+
+        Passing a seed turns on deterministic mode: uuid and filenames come from
+        a seeded RNG, and result_id is used as given instead of being allocated.
+        A seed requires a result_id, since bundles that share one collide in game.
+        """
+        if seed is not None and result_id is None:
+            raise ValueError('result_id is required with a seed')
         try:
-            # Add small delay to simulate processing
-            time.sleep(0.1)
-            
-            random_filename = ''.join(random.choices(string.digits, k=10))
-            uuid_value = str(uuid.uuid4())
-            start_result_id = self.auto_result_id_counter
-            self.auto_result_id_counter += 1
-            
-            # Main mod file
-            main_mod_data = {
-                "PhysicsActor": [],
-                "avatarInfo": [],
-                "foreign_ids": [],
-                "mod_desc": {
-                    "author": author_value,
-                    "filename": random_filename,
-                    "uuid": uuid_value,
-                    "version": "1"
-                },
-                "property": {
-                    "copyid": copyid_value,
-                    "id": id_value
-                },
-                "set_ai": [{"name": "swimming", "priority": 1}]
-            }
-            
-            # Ride file
-            ride_data = {
-                "property": {
-                    "id": id_value,
-                    "copyid": copyid_value
-                }
-            }
-            
-            # Crafting file
-            crafting_data = {
-                "PhysicsActor": [],
-                "avatarInfo": [],
-                "foreign_ids": [
-                    {
-                        "id": start_result_id,
-                        "key": f"{author_value}{uuid_value.replace('-', '')}{random_filename}"
-                    }
-                ],
-                "mod_desc": {
-                    "author": author_value,
-                    "filename": ''.join(random.choices(string.digits, k=10)),
-                    "uuid": uuid_value,
-                    "version": "1"
-                },
-                "property": {
-                    "CraftingItemID": 11000,
-                    "copyid": copyid_value,
-                    "id": start_result_id + 1,
-                    "material_count1": 1,
-                    "material_count2": 0,
-                    "material_count3": 0,
-                    "material_count4": 0,
-                    "material_count5": 0,
-                    "material_count6": 0,
-                    "material_count7": 0,
-                    "material_count8": 0,
-                    "material_count9": 0,
-                    "material_id1": 101,
-                    "material_id2": 0,
-                    "material_id3": 0,
-                    "material_id4": 0,
-                    "material_id5": 0,
-                    "material_id6": 0,
-                    "material_id7": 0,
-                    "material_id8": 0,
-                    "material_id9": 0,
-                    "result_count": 1,
-                    "result_id": start_result_id,
-                    "type": 0
-                }
-            }
-            
-            # Item file
-            item_data = {
-                "PhysicsActor": {
-                    "EditType": 2,
-                    "ModelScale": 1,
-                    "ShapeID": 0,
-                    "ShapeVal1": 50,
-                    "ShapeVal2": 0,
-                    "ShapeVal3": 0
-                },
-                "avatarInfo": [],
-                "foreign_ids": [
-                    {
-                        "id": start_result_id,
-                        "key": f"{author_value}{uuid_value.replace('-', '')}{random_filename}"
-                    }
-                ],
-                "itemskills": [
-                    {
-                        "ChargeTime": 1.5,
-                        "ChargeType": 0,
-                        "Cooldown": 5,
-                        "Costs": [
-                            {
-                                "CostTarget": 10100,
-                                "CostType": 1,
-                                "CostVal": 0
-                            }
-                        ],
-                        "Functions": [
-                            {
-                                "CallNum": 1,
-                                "Duration": 0,
-                                "IsFollow": 0,
-                                "MobID": id_value
-                            }
-                        ],
-                        "RangeType": 0,
-                        "RangeVal1": 1000,
-                        "RangeVal2": 300,
-                        "RangeVal3": 300,
-                        "SkillType": 1,
-                        "TargetCamp": 0,
-                        "name": "feature_call_monster",
-                        "priority": 0,
-                        "templateid": 103
-                    }
-                ],
-                "mod_desc": {
-                    "author": author_value,
-                    "filename": ''.join(random.choices(string.digits, k=10)),
-                    "uuid": uuid_value,
-                    "version": "1"
-                },
-                "property": {
-                    "copyid": 10100,
-                    "describe": "",
-                    "icon": "*11653",
-                    "id": start_result_id,
-                    "model": "*11653",
-                    "name": item_name,
-                    "orignid": start_result_id,
-                    "stack_max": 1
-                }
-            }
-            
-            generated_files = {
-                f"{copyid_value}du.json": (json.dumps(main_mod_data, indent=2, ensure_ascii=False), "actor"),
-                f"{copyid_value}duride.json": (json.dumps(ride_data, indent=2, ensure_ascii=False), "horse"),
-                f"craft{copyid_value}.json": (json.dumps(crafting_data, indent=2, ensure_ascii=False), "crafting"),
-                f"item{copyid_value}.json": (json.dumps(item_data, indent=2, ensure_ascii=False), "item")
-            }
+            if seed is None:
+                start_result_id = self.result_id_allocator.reserve() if result_id is None else result_id
+                return build_mod_files(
+                    id_value, copyid_value, author_value, item_name, start_result_id, compact=self.compact
+                )
             
-            return {
-                'files': generated_files,
-                'uuid': uuid_value,
-                'random_filename': random_filename,
-                'id': id_value,
-                'copyid': copyid_value,
-                'author': author_value,
-                'item_name': item_name,
-                'result_id_used': start_result_id
-            }
+            rng = seeded_rng(seed, id_value, copyid_value, author_value, item_name, result_id)
+            return build_mod_files(
+                id_value, copyid_value, author_value, item_name, result_id, rng, compact=self.compact
+            )
             
         except Exception as e:
-            print(f"Error in generate_files: {str(e)}")
+            logger.error('Error in generate_files: %s', e)
             return None
+
+    def generate_bulk(self, creatures, author_value, archive=None, workers=None, progress=None):
+        """Generate mods for (copy_id, name) pairs into a single archive
+
+        See iter_bulk(); progress(done, total) is called after each creature.
+        The returned timings hold the seconds spent per stage.
+        """
+        timings = new_timings()
+        total = len(creatures) if hasattr(creatures, '__len__') else None
+        if archive is None:
+            archive = ModArchive()
+        
+        done = 0
+        first = last = None
+        for done, result in enumerate(self.iter_bulk(creatures, author_value, archive, workers, timings), 1):
+            if first is None:
+                first = (result['id'], result['result_id_used'])
+            last = (result['id'], result['result_id_used'])
+            if progress:
+                progress(done, total)
+        
+        return {
+            'archive': archive,
+            'total_creatures': done,
+            'total_files': archive.file_count,
+            'start_id': first[0] if first else None,
+            'next_id': last[0] + 1 if last else None,
+            'start_result_id': first[1] if first else None,
+            'next_result_id': last[1] + 1 if last else None,
+            'timings': timings
+        }
+    
+    def iter_bulk(self, creatures, author_value, archive, workers=None, timings=None):
+        """Write mods for (copy_id, name) pairs into archive, yielding each result once written
+
+        Each creature gets its id and result_id in input order, so the archive
+        is the same whether it was built serially or in parallel. Sized inputs
+        reserve both ranges up front; other iterables are consumed lazily and
+        reserve one block at a time. Results are not kept.
+        """
+        if timings is None:
+            timings = new_timings()
+        total = len(creatures) if hasattr(creatures, '__len__') else None
+        if total is not None:
+            # Reserve both ranges in one call each, before any work starts
+            started = time.perf_counter()
+            start_id = self.id_allocator.reserve(total)
+            start_result_id = self.result_id_allocator.reserve(total)
+            timings['id_allocation'] += time.perf_counter() - started
+            jobs = plan_bulk(creatures, author_value, start_id, start_result_id)
+        else:
+            jobs = self._plan_blocks(creatures, author_value, timings)
+        
+        yield from self.write_jobs(jobs, archive, workers, timings)
+    
+    def plan_many(self, mods, author_value, timings=None):
+        """Plan jobs for a sequence of (id, copy_id) pairs
+
+        A pair whose id is None gets the next auto ID. Result IDs for the whole
+        batch, and auto IDs for the pairs that need one, are each reserved in a
+        single block. Names come from the creature catalog. Build the planned
+        jobs with write_jobs().
+        """
+        started = time.perf_counter()
+        missing = sum(1 for id_value, _ in mods if id_value is None)
+        next_auto_id = self.id_allocator.reserve(missing) if missing else None
+        start_result_id = self.result_id_allocator.reserve(len(mods))
+        if timings is not None:
+            timings['id_allocation'] += time.perf_counter() - started
+        
+        jobs = []
+        for offset, (id_value, copy_id) in enumerate(mods):
+            if id_value is None:
+                id_value = next_auto_id
+                next_auto_id += 1
+            jobs.append((id_value, copy_id, author_value, self.catalog.name(copy_id), start_result_id + offset))
+        return jobs
+    
+    def write_jobs(self, jobs, archive, workers=None, timings=None):
+        """Build planned jobs into the archive, yielding each result once it is written
+
+        Lazy jobs (see _plan_blocks) may reserve IDs while a result is being
+        built; that time is counted as id_allocation, not json_build.
+        """
+        if timings is None:
+            timings = new_timings()
+        mark = time.perf_counter()
+        allocated = timings['id_allocation']
+        for result in run_bulk(jobs, workers, self.compact):
+            built = time.perf_counter()
+            archive.add_files(result['files'])
+            timings['json_build'] += built - mark - (timings['id_allocation'] - allocated)
+            timings['archive_assembly'] += time.perf_counter() - built
+            yield result
+            mark = time.perf_counter()
+            allocated = timings['id_allocation']
+    
+    def _plan_blocks(self, creatures, author_value, timings):
+        """Plan jobs for an unsized iterable, reserving IDs one chunk at a time"""
+        for block in iter_chunks(creatures, BULK_CHUNK_SIZE):
+            started = time.perf_counter()
+            start_id = self.id_allocator.reserve(len(block))
+            start_result_id = self.result_id_allocator.reserve(len(block))
+            timings['id_allocation'] += time.perf_counter() - started
+            yield from plan_bulk(block, author_value, start_id, start_result_id)
+
+
+def read_manifest(path, default_author=None):
+    """Yield (id, copyid, author, name) rows from a CSV, JSON or JSON Lines manifest
+
+    CSV needs a header with id, copyid and (unless default_author is given)
+    author columns; JSON is a list of objects or [id, copyid, author] arrays.
+    A missing name is looked up in the creature catalog. CSV and JSON Lines
+    are read one line at a time; a JSON document has to be parsed whole, so
+    use one of the others for very large manifests. A copyid may appear only
+    once, since it names the output files.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding='utf-8', newline='') as f:
+        if extension == '.csv':
+            records = csv.DictReader(f)
+        elif extension in ('.jsonl', '.ndjson'):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = json.load(f)
+        yield from _manifest_rows(records, default_author)
+
+
+def _manifest_rows(records, default_author):
+    # Output paths come from the copyid alone, so a repeat would overwrite an earlier row
+    seen = set()
+    for number, record in enumerate(records, 1):
+        if isinstance(record, (list, tuple)):
+            record = dict(zip(('id', 'copyid', 'author', 'name'), record))
+        author_value = str(record.get('author') or default_author or '').strip()
+        if not author_value:
+            raise ValueError(f'Row {number}: author is required')
+        try:
+            id_value = int(record['id'])
+            copy_id = int(record['copyid'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'Row {number}: id and copyid must be integers')
+        if copy_id in seen:
+            raise ValueError(f'Row {number}: copyid {copy_id} is repeated; each creature can appear once per output')
+        seen.add(copy_id)
+        yield (id_value, copy_id, author_value, record.get('name') or CATALOG.name(copy_id))
+
+
+def main(argv=None):
+    """Batch-generate mods from a manifest without Tk or an HTTP server"""
+    parser = argparse.ArgumentParser(
+        prog='python -m mod_generator',
+        description='Generate Mini World mod files for every row of a CSV/JSON manifest.'
+    )
+    parser.add_argument('manifest', help='CSV, JSON or JSON Lines file of id, copyid, author[, name] rows')
+    parser.add_argument('-o', '--output', required=True, help='output .zip file or directory')
+    parser.add_argument('--format', choices=('zip', 'dir', 'pack'),
+                        help='output format (default: zip or pack from the OUTPUT suffix, else dir)')
+    parser.add_argument('--author', help='author for rows that do not set one')
+    parser.add_argument('--start-result-id', type=int, default=ModGenerator.DEFAULT_RESULT_ID,
+                        help='first result ID; rows get consecutive IDs (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--compact', action='store_true', help='write JSON without indentation')
+    parser.add_argument('--compression', choices=tuple(COMPRESSION_POLICIES), default=DEFAULT_COMPRESSION,
+                        help='ZIP compression (default: %(default)s)')
+    parser.add_argument('--codec', choices=('xz', 'zdict'), default='xz',
+                        help='pack codec, see mod_pack (default: %(default)s)')
+    parser.add_argument('--progress-every', type=int, default=1000, metavar='N',
+                        help='report progress every N mods (default: %(default)s)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args(argv)
+    
+    output_format = args.format or {'.zip': 'zip', '.mwpack': 'pack'}.get(
+        os.path.splitext(args.output)[1].lower(), 'dir')
+    
+    if not os.path.isfile(args.manifest):
+        print(f'Error reading manifest: {args.manifest} not found', file=sys.stderr)
+        return 2
+    
+    # Rows are read, built and written one at a time; nothing is kept in memory
+    jobs = (
+        (id_value, copy_id, author_value, name, args.start_result_id + i)
+        for i, (id_value, copy_id, author_value, name) in enumerate(
+            read_manifest(args.manifest, args.author))
+    )
+    
+    started = time.perf_counter()
+    target = None
+    if output_format == 'zip':
+        target = open(args.output, 'wb')
+        writer = ModArchive(target=target, compression=args.compression)
+    elif output_format == 'pack':
+        # Imported here: mod_pack itself imports this module
+        from mod_pack import ModPack
+        target = open(args.output, 'wb')
+        writer = ModPack(target=target, codec=args.codec)
+    else:
+        writer = ModDirectory(args.output)
+    
+    completed = False
+    try:
+        done = 0
+        for done, result in enumerate(run_bulk(jobs, args.workers, args.compact), 1):
+            writer.add_files(result['files'])
+            if not args.quiet and args.progress_every and done % args.progress_every == 0:
+                elapsed = time.perf_counter() - started
+                print(f'{done} mods, {done / elapsed:.0f} mods/s', file=sys.stderr)
+        writer.close()
+        size = writer.size
+        completed = True
+    except ValueError as e:
+        print(f'Error reading manifest: {e}', file=sys.stderr)
+        return 2
+    finally:
+        if target is not None:
+            if not completed:
+                # The writer owns the file until it is closed; then drop the partial output
+                writer.close()
+            target.close()
+            if not completed:
+                os.remove(args.output)
+    
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0
+    print(
+        f'Generated {done} mods ({writer.file_count} files, {size} bytes) '
+        f'to {args.output} in {elapsed:.2f}s ({rate:.0f} mods/s)',
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Mod packs: a compact alternative to ZIP for shipping many generated mods
+
+Every creature's four files share almost all of their text with every other
+creature's, but a ZIP compresses each entry on its own and cannot use that.
+A .mwpack compresses across files, with one of two codecs:
+
+    xz     solid LZMA over the whole pack; smallest, read front to back
+    zdict  each file deflated against a shared preset dictionary built from
+           the mod templates; larger than xz, but any file can be inflated
+           on its own and it is much cheaper to write
+
+Layout: MAGIC, a (version, codec, dictionary length) header, the
+zlib-compressed dictionary (zdict only) and the records. A record is a
+(path length, data length) header followed by the "Folder/filename" path
+and the data, and a (0, 0) header ends the pack. With xz the records are
+one LZMA stream; with zdict each record's data is compressed separately.
+
+    python -m mod_pack unpack pack.mwpack -o mods/          # folders
+    python -m mod_pack unpack pack.mwpack -o mods.zip       # a ZIP for the game
+    python -m mod_pack pack mods.zip -o pack.mwpack --codec zdict
+    python -m mod_pack info pack.mwpack
+"""
+
+import argparse
+import io
+import lzma
+import ntpath
+import os
+import random
+import struct
+import sys
+import zipfile
+import zlib
+
+from mod_generator import (
+    CATALOG, DEFAULT_COMPRESSION, FILE_TYPES, FOLDERS, COMPRESSION_POLICIES,
+    ChunkSink, ModArchive, ModDirectory, ModGenerator, build_mod_files
+)
+
+MAGIC = b'MWPK'
+PACK_FORMAT_VERSION = 1
+PACK_CODECS = {'xz': 1, 'zdict': 2}
+DEFAULT_CODEC = 'xz'
+PACK_SUFFIX = '.mwpack'
+
+HEADER = struct.Struct('>4sBBI')
+RECORD = struct.Struct('>HI')
+
+# zlib only looks back 32 KiB, so a larger dictionary is wasted
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def train_dictionary(samples, size=MAX_DICTIONARY_SIZE):
+    """Build a zlib preset dictionary from sample file contents
+
+    zlib finds the end of the dictionary cheapest to reference, so samples
+    are given in increasing order of importance and the oldest bytes are
+    dropped when they do not fit.
+    """
+    dictionary = b''.join(
+        sample.encode('utf-8') if isinstance(sample, str) else sample for sample in samples
+    )
+    return dictionary[-size:]
+
+
+def template_samples():
+    """One representative creature in each JSON layout, compact first"""
+    samples = []
+    for compact in (True, False):
+        files = build_mod_files(
+            2, 3430, 'author', CATALOG.name(3430), ModGenerator.DEFAULT_RESULT_ID,
+            rng=random.Random(0), compact=compact
+        )['files']
+        samples.extend(content for content, _ in files.values())
+    return samples
+
+
+# Pre-trained from the templates, so small packs benefit as much as large ones
+DEFAULT_DICTIONARY = train_dictionary(template_samples())
+
+
+class ModPack:
+    """.mwpack builder with the same add_files() interface as ModArchive"""
+
+    def __init__(self, target=None, codec=DEFAULT_CODEC, dictionary=None, preset=6):
+        if codec not in PACK_CODECS:
+            raise ValueError(f'Unknown pack codec {codec!r}; choose from {", ".join(PACK_CODECS)}')
+        self.buffer = io.BytesIO() if target is None else target
+        self.codec = codec
+        self.file_count = 0
+        self.raw_size = 0
+        self.closed = False
+        self.written = 0
+
+        stored_dictionary = b''
+        if codec == 'zdict':
+            self.dictionary = DEFAULT_DICTIONARY if dictionary is None else dictionary
+            stored_dictionary = zlib.compress(self.dictionary, 9)
+            self.compressor = None
+        else:
+            self.dictionary = None
+            self.compressor = lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=preset)
+        self._write(HEADER.pack(MAGIC, PACK_FORMAT_VERSION, PACK_CODECS[codec], len(stored_dictionary)))
+        self._write(stored_dictionary)
+
+    def _write(self, data):
+        if data:
+            self.buffer.write(data)
+            self.written += len(data)
+
+    def _write_record(self, path, data):
+        path = path.encode('utf-8')
+        if self.compressor is not None:
+            self._write(self.compressor.compress(RECORD.pack(len(path), len(data)) + path + data))
+            return
+        compressor = zlib.compressobj(9, zdict=self.dictionary)
+        data = compressor.compress(data) + compressor.flush()
+        self._write(RECORD.pack(len(path), len(data)) + path + data)
+
+    def add_files(self, files):
+        """Write (content, file_type) tuples under their Actor/Horse/Crafting/Item folders"""
+        for filename, (content, file_type) in files.items():
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            self._write_record(f'{FOLDERS.get(file_type, "Other")}/{filename}', content)
+            self.file_count += 1
+            self.raw_size += len(content)
+
+    @property
+    def size(self):
+        """Compressed bytes written so far"""
+        return self.written
+
+    def close(self):
+        """Write the end marker (the target file is left open)"""
+        if self.closed:
+            return
+        self.closed = True
+        end = RECORD.pack(0, 0)
+        if self.compressor is not None:
+            self._write(self.compressor.compress(end) + self.compressor.flush())
+        else:
+            self._write(end)
+
+    def getvalue(self):
+        """Finish the pack and return its bytes"""
+        self.close()
+        return self.buffer.getvalue()
+
+
+class StreamingModPack(ModPack):
+    """ModPack read with drain() and finish(), like StreamingModArchive"""
+
+    def __init__(self, codec=DEFAULT_CODEC, dictionary=None, preset=6):
+        super().__init__(target=ChunkSink(), codec=codec, dictionary=dictionary, preset=preset)
+
+    @property
+    def pending(self):
+        """Bytes written but not drained yet"""
+        return self.buffer.pending
+
+    def drain(self):
+        return self.buffer.drain()
+
+    def finish(self):
+        """Write the end marker and return the remaining bytes"""
+        self.close()
+        return self.buffer.drain()
+
+    def getvalue(self):
+        raise TypeError('StreamingModPack is read with drain() and finish()')
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError('Truncated mod pack')
+    return data
+
+
+def read_header(stream):
+    """Read the pack header and return (codec, dictionary)"""
+    magic, version, codec_id, dictionary_size = HEADER.unpack(_read_exact(stream, HEADER.size))
+    if magic != MAGIC:
+        raise ValueError('Not a mod pack')
+    if version != PACK_FORMAT_VERSION:
+        raise ValueError(f'Unsupported mod pack version {version}')
+    codecs = {value: name for name, value in PACK_CODECS.items()}
+    if codec_id not in codecs:
+        raise ValueError(f'Unknown mod pack codec {codec_id}')
+    dictionary = zlib.decompress(_read_exact(stream, dictionary_size)) if dictionary_size else None
+    return codecs[codec_id], dictionary
+
+
+def iter_pack(stream):
+    """Yield (path, bytes) for every file in a pack read from a binary stream"""
+    codec, dictionary = read_header(stream)
+    records = lzma.LZMAFile(stream) if codec == 'xz' else stream
+    while True:
+        path_size, data_size = RECORD.unpack(_read_exact(records, RECORD.size))
+        if not path_size:
+            return
+        path = _read_exact(records, path_size).decode('utf-8')
+        data = _read_exact(records, data_size)
+        if codec == 'zdict':
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            data = decompressor.decompress(data) + decompressor.flush()
+        yield path, data
+
+
+def read_files(pack_data, encoding='utf-8'):
+    """Read a pack back into (content, file_type) tuples, like ModArchive.read_files"""
+    files = {}
+    for path, content in iter_pack(io.BytesIO(pack_data)):
+        folder_name, _, filename = path.partition('/')
+        if encoding:
+            content = content.decode(encoding)
+        files[filename] = (content, FILE_TYPES.get(folder_name, 'other'))
+    return files
+
+
+def iter_source(path):
+    """Yield (path, bytes) from a ZIP, a pack or a mod directory"""
+    if os.path.isdir(path):
+        for folder_name in sorted(os.listdir(path)):
+            folder = os.path.join(path, folder_name)
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                with open(os.path.join(folder, filename), 'rb') as f:
+                    yield f'{folder_name}/{filename}', f.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zipf:
+            for info in zipf.infolist():
+                if not info.is_dir():
+                    yield info.filename, zipf.read(info)
+    else:
+        with open(path, 'rb') as f:
+            yield from iter_pack(f)
+
+
+def check_filename(filename):
+    """Raise ValueError unless filename is a plain file name, safe to join to a folder
+
+    Packs are shared between players, so names are checked against Windows
+    rules too: no backslashes, drives, absolute paths or "..".
+    """
+    if (not filename or filename == '.' or '\\' in filename or '..' in filename
+            or ntpath.splitdrive(filename)[0] or ntpath.isabs(filename) or os.path.isabs(filename)):
+        raise ValueError(f'Unsafe file name in mod pack: {filename!r}')
+    return filename
+
+
+def copy_files(source, writer):
+    """Write every (path, bytes) from source into a ModArchive, ModDirectory or ModPack"""
+    for path, content in source:
+        folder_name, _, filename = path.rpartition('/')
+        check_filename(filename)
+        writer.add_files({filename: (content, FILE_TYPES.get(folder_name, 'other'))})
+    writer.close()
+
+
+def main(argv=None):
+    """Convert between mod packs, ZIPs and mod folders"""
+    parser = argparse.ArgumentParser(
+        prog='python -m mod_pack',
+        description='Pack generated mods into a .mwpack, or unpack one into folders or a ZIP.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    pack_parser = commands.add_parser('pack', help='build a pack from a ZIP, pack or mod directory')
+    pack_parser.add_argument('source', help='.zip, .mwpack or directory of Actor/Horse/Crafting/Item folders')
+    pack_parser.add_argument('-o', '--output', required=True, help='output .mwpack file')
+    pack_parser.add_argument('--codec', choices=tuple(PACK_CODECS), default=DEFAULT_CODEC,
+                             help='pack codec (default: %(default)s)')
+
+    unpack_parser = commands.add_parser('unpack', help='extract a pack into folders or a ZIP')
+    unpack_parser.add_argument('pack', help='.mwpack file')
+    unpack_parser.add_argument('-o', '--output', required=True, help='output directory or .zip file')
+    unpack_parser.add_argument('--compression', choices=tuple(COMPRESSION_POLICIES), default=DEFAULT_COMPRESSION,
+                               help='ZIP compression when OUTPUT is a .zip (default: %(default)s)')
+
+    info_parser = commands.add_parser('info', help='show what a pack contains')
+    info_parser.add_argument('pack', help='.mwpack file')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'info':
+            with open(args.pack, 'rb') as f:
+                codec, _ = read_header(f)
+                f.seek(0)
+                count = raw_size = 0
+                for _, content in iter_pack(f):
+                    count += 1
+                    raw_size += len(content)
+            size = os.path.getsize(args.pack)
+            print(f'{args.pack}: {codec}, {count} files, {raw_size} bytes unpacked, '
+                  f'{size} bytes packed ({size / raw_size if raw_size else 0:.1%})')
+            return 0
+
+        if args.command == 'pack':
+            with open(args.output, 'wb') as target:
+                writer = ModPack(target=target, codec=args.codec)
+                copy_files(iter_source(args.source), writer)
+            print(f'Packed {writer.file_count} files ({writer.raw_size} bytes) '
+                  f'into {args.output} ({writer.size} bytes)', file=sys.stderr)
+            return 0
+
+        with open(args.pack, 'rb') as f:
+            if args.output.lower().endswith('.zip'):
+                with open(args.output, 'wb') as target:
+                    writer = ModArchive(target=target, compression=args.compression)
+                    copy_files(iter_pack(f), writer)
+            else:
+                writer = ModDirectory(args.output)
+                copy_files(iter_pack(f), writer)
+        print(f'Unpacked {writer.file_count} files to {args.output}', file=sys.stderr)
+        return 0
+    except (OSError, ValueError, lzma.LZMAError, zlib.error) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
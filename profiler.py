@@ -0,0 +1,171 @@
+import cProfile
+import hmac
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+
+FORMATS = {
+    # format -> (file suffix, download mimetype)
+    'pstats': ('.prof', 'application/octet-stream'),
+    'collapsed': ('.folded', 'text/plain')
+}
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval
+
+    Stacks are counted in collapsed form ("outer;inner;leaf"), which is what
+    flamegraph.pl, speedscope and similar tools read.
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+class RequestProfiler:
+    """Opt-in profiling of single requests, gated by a shared secret
+
+    A request asks for a profile with the X-Profile header or the profile
+    query parameter set to the secret, and picks the output with
+    X-Profile-Format / profile_format: "pstats" (cProfile, the default) or
+    "collapsed" (sampled stacks for flamegraphs). Profiles are written to
+    directory, which keeps only the newest max_files. Without a secret the
+    profiler is disabled.
+    """
+
+    def __init__(self, secret=None, directory=None, max_files=50, interval=0.001):
+        self.secret = secret
+        self.directory = directory
+        self.max_files = max_files
+        self.interval = interval
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return bool(self.secret and self.directory)
+
+    def authorized(self, request):
+        """Whether the request carries the profiling secret"""
+        if not self.enabled:
+            return False
+        supplied = request.headers.get('X-Profile') or request.args.get('profile') or ''
+        return hmac.compare_digest(supplied.encode('utf-8'), self.secret.encode('utf-8'))
+
+    def requested(self, request):
+        """Return (profile_id, format) if this request should be profiled, else None"""
+        if not self.authorized(request):
+            return None
+        profile_format = request.headers.get('X-Profile-Format') or request.args.get('profile_format') or 'pstats'
+        if profile_format not in FORMATS:
+            profile_format = 'pstats'
+        return uuid.uuid4().hex, profile_format
+
+    def call(self, spec, func, *args, **kwargs):
+        """Run func under the profiler chosen by spec and save the profile"""
+        profile_id, profile_format = spec
+        path = os.path.join(self.directory, profile_id + FORMATS[profile_format][0])
+        if profile_format == 'pstats':
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                profile.dump_stats(path)
+                self._trim()
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sampler.stop()
+            sampler.dump(path)
+            self._trim()
+
+    def call_iter(self, spec, iterable):
+        """Profile the work done while iterating, e.g. a streamed response body"""
+        profile_id, profile_format = spec
+        path = os.path.join(self.directory, profile_id + FORMATS[profile_format][0])
+        if profile_format == 'pstats':
+            profile = cProfile.Profile()
+            iterator = iter(iterable)
+            try:
+                while True:
+                    # Only time spent producing items is profiled, not the consumer's
+                    profile.enable()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        profile.disable()
+                    yield item
+            finally:
+                profile.dump_stats(path)
+                self._trim()
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            yield from iterable
+        finally:
+            sampler.stop()
+            sampler.dump(path)
+            self._trim()
+
+    def find(self, profile_id):
+        """Return (path, mimetype) of a saved profile, or None"""
+        if not self.enabled or not profile_id.isalnum():
+            return None
+        for suffix, mimetype in FORMATS.values():
+            path = os.path.join(self.directory, profile_id + suffix)
+            if os.path.exists(path):
+                return path, mimetype
+        return None
+
+    def _trim(self):
+        with self._lock:
+            try:
+                entries = [
+                    (os.stat(os.path.join(self.directory, name)).st_mtime, name)
+                    for name in os.listdir(self.directory)
+                    if name.endswith(tuple(suffix for suffix, _ in FORMATS.values()))
+                ]
+            except OSError:
+                return
+            for _, name in sorted(entries)[:max(0, len(entries) - self.max_files)]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,65 @@
+import json
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonSerializer:
+    """Turns mod documents into JSON text
+
+    The default layout is json.dumps(indent=2); compact drops all whitespace,
+    which the game reads just as well. orjson is used when it is installed.
+    For the mod documents (str keys; str, int and plain decimal floats such as
+    1.5) it gives the same text as the standard library. Floats that need an
+    exponent do not match (orjson writes 1e20, json 1e+20). Anything orjson
+    rejects, or any non-ASCII output when ensure_ascii is set, falls back to
+    json.dumps.
+    """
+
+    def __init__(self, compact=False, ensure_ascii=False, backend=None):
+        if backend is None:
+            backend = 'orjson' if orjson is not None else 'json'
+        if backend == 'orjson' and orjson is None:
+            raise ValueError('orjson is not installed')
+        if backend not in ('orjson', 'json'):
+            raise ValueError(f'Unknown JSON backend: {backend}')
+        self.compact = compact
+        self.ensure_ascii = ensure_ascii
+        self.backend = backend
+        if compact:
+            self._json_options = {'separators': (',', ':')}
+            self._orjson_option = 0
+        else:
+            self._json_options = {'indent': 2}
+            self._orjson_option = orjson.OPT_INDENT_2 if orjson is not None else 0
+        self._encode_string = encode_basestring_ascii if ensure_ascii else encode_basestring
+
+    def dumps(self, document):
+        """Serialize a whole document"""
+        if self.backend == 'orjson':
+            try:
+                text = orjson.dumps(document, option=self._orjson_option).decode('utf-8')
+            except orjson.JSONEncodeError:
+                text = None
+            if text is not None and (not self.ensure_ascii or text.isascii()):
+                return text
+        return json.dumps(document, ensure_ascii=self.ensure_ascii, **self._json_options)
+
+    def dumps_value(self, value):
+        """Serialize one scalar exactly as it would appear inside dumps() output"""
+        value_type = type(value)
+        if value_type is str:
+            return self._encode_string(value)
+        if value_type is int:
+            return int.__repr__(value)
+        if value_type is float:
+            return json.dumps(value)
+        return self.dumps(value)
+
+
+# Shared instances: the historical indented layout and the compact one
+INDENTED = JsonSerializer()
+COMPACT = JsonSerializer(compact=True)
@@ -30,6 +30,30 @@ import random
 import string
 import shutil
 
+try:
+    import orjson  # Optional: faster JSON encoding
+except ImportError:
+    orjson = None
+
+def dump_json(data):
+    """Indented JSON, same text as json.dumps(data, indent=2, ensure_ascii=False) for the mod files"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+# ZIP compression choices: name -> (method, level). LZMA is smaller but some
+# unzip tools cannot open it, so keep Deflate for files shared with players.
+ZIP_COMPRESSION = {
+    'Deflate': (zipfile.ZIP_DEFLATED, None),
+    'Deflate (fast)': (zipfile.ZIP_DEFLATED, 1),
+    'Deflate (max)': (zipfile.ZIP_DEFLATED, 9),
+    'Store (no compression)': (zipfile.ZIP_STORED, None),
+    'LZMA': (zipfile.ZIP_LZMA, None)
+}
+
 class FileGeneratorThread(threading.Thread):
     def __init__(self, id_value, copyid_value, author_value, item_name, start_result_id, callback):
         super().__init__()
@@ -68,7 +92,7 @@ class FileGeneratorThread(threading.Thread):
             }
         }
         files[f"{self.copyid_value}du.json"] = {
-            'content': json.dumps(actor_content, indent=2, ensure_ascii=False),
+            'content': dump_json(actor_content),
             'type': 'actor'
         }
         
@@ -79,7 +103,7 @@ class FileGeneratorThread(threading.Thread):
             }
         }
         files[f"{self.copyid_value}duride.json"] = {
-            'content': json.dumps(horse_content, indent=2, ensure_ascii=False),
+            'content': dump_json(horse_content),
             'type': 'horse'
         }
         
@@ -111,7 +135,7 @@ class FileGeneratorThread(threading.Thread):
             ]
         }
         files[f"craft{self.copyid_value}.json"] = {
-            'content': json.dumps(craft_content, indent=2, ensure_ascii=False),
+            'content': dump_json(craft_content),
             'type': 'crafting'
         }
         
@@ -155,7 +179,7 @@ class FileGeneratorThread(threading.Thread):
             }
         }
         files[f"item{self.copyid_value}.json"] = {
-            'content': json.dumps(item_content, indent=2, ensure_ascii=False),
+            'content': dump_json(item_content),
             'type': 'item'
         }
         
@@ -285,9 +309,16 @@ class CompactModGenerator:
         folder_btn = ttk.Button(folder_frame, text="Browse", command=self.choose_folder)
         folder_btn.grid(row=0, column=1, padx=(5, 0))
         
+        # ZIP compression
+        ttk.Label(main_frame, text="Compression:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        self.compression_var = tk.StringVar(value='Deflate')
+        compression_combo = ttk.Combobox(main_frame, textvariable=self.compression_var,
+                                         values=list(ZIP_COMPRESSION), state='readonly', width=25)
+        compression_combo.grid(row=5, column=1, sticky=tk.W, pady=5)
+        
         # Buttons frame
         btn_frame = ttk.Frame(main_frame)
-        btn_frame.grid(row=5, column=0, columnspan=2, pady=20)
+        btn_frame.grid(row=6, column=0, columnspan=2, pady=20)
         
         # Generate button
         generate_btn = ttk.Button(btn_frame, text="Generate Files", command=self.generate_files)
@@ -304,16 +335,16 @@ class CompactModGenerator:
         
         # Status text
         self.status_text = tk.Text(main_frame, height=15, width=70)
-        self.status_text.grid(row=6, column=0, columnspan=2, pady=(20, 0), sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.status_text.grid(row=7, column=0, columnspan=2, pady=(20, 0), sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Scrollbar for status text
         scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.status_text.yview)
-        scrollbar.grid(row=6, column=2, sticky=(tk.N, tk.S))
+        scrollbar.grid(row=7, column=2, sticky=(tk.N, tk.S))
         self.status_text.configure(yscrollcommand=scrollbar.set)
         
         # Configure grid weights
         main_frame.columnconfigure(1, weight=1)
-        main_frame.rowconfigure(6, weight=1)
+        main_frame.rowconfigure(7, weight=1)
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         folder_frame.columnconfigure(0, weight=1)
@@ -420,7 +451,8 @@ class CompactModGenerator:
             
             # Create ZIP file
             zip_path = f"{output_dir}.zip"
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            method, level = ZIP_COMPRESSION[self.compression_var.get()]
+            with zipfile.ZipFile(zip_path, 'w', method, compresslevel=level) as zipf:
                 for file_path in written_files:
                     relative_path = os.path.relpath(file_path, output_dir)
                     zipf.write(file_path, relative_path)
@@ -473,7 +505,6 @@ class CompactModGenerator:
             
             total_creatures = len(self.creature_groups)
             success_count = 0
-            all_written_files = []
             
             current_id = self.auto_id_counter
             current_result_id = self.auto_result_id_counter
@@ -504,7 +535,8 @@ class CompactModGenerator:
             
             # Create final ZIP
             zip_path = f"{output_dir}.zip"
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            method, level = ZIP_COMPRESSION[self.compression_var.get()]
+            with zipfile.ZipFile(zip_path, 'w', method, compresslevel=level) as zipf:
                 for root, dirs, files in os.walk(output_dir):
                     for file in files:
                         file_path = os.path.join(root, file)
@@ -155,23 +155,30 @@ document.addEventListener('DOMContentLoaded', function() {
                 body: formData
             })
             .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    throw new Error(data.error || 'Đã xảy ra lỗi khi tạo auto mod');
+                }
+                // The pack is built in the background; poll until it is ready
+                return pollJob(data.status_url, job => {
+                    setProgressText(`Đang tạo: ${job.done}/${job.total || '?'} thần thú (${job.bytes_written} bytes)`);
+                });
+            })
             .then(data => {
                 progressModal.hide();
+                setProgressText('');
                 autoBtn.disabled = false;
                 autoBtn.innerHTML = '<i class="fas fa-robot me-1"></i>🤖 Auto';
                 
-                if (data.success) {
-                    showAutoSuccessModal(data, successModal);
-                    updateStatus(`✅ Tạo thành công ${data.total_files} files cho ${data.total_creatures} thần thú!`, 'success');
-                } else {
-                    showErrorMessage(data.error || 'Đã xảy ra lỗi khi tạo auto mod');
-                }
+                showAutoSuccessModal(data, successModal);
+                updateStatus(`✅ Tạo thành công ${data.total_files} files cho ${data.total_creatures} thần thú!`, 'success');
             })
             .catch(error => {
                 progressModal.hide();
+                setProgressText('');
                 autoBtn.disabled = false;
                 autoBtn.innerHTML = '<i class="fas fa-robot me-1"></i>🤖 Auto';
-                showErrorMessage('Lỗi mạng: ' + error.message);
+                showErrorMessage(error.message);
             });
         });
         
@@ -219,6 +226,36 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Poll a background job until it finishes; resolves with the final job data
+    function pollJob(statusUrl, onProgress, interval = 500) {
+        return new Promise((resolve, reject) => {
+            function check() {
+                fetch(statusUrl)
+                    .then(response => response.json())
+                    .then(job => {
+                        if (job.status === 'done') {
+                            resolve(job);
+                        } else if (job.status === 'error' || job.success === false) {
+                            reject(new Error(job.error || 'Đã xảy ra lỗi khi tạo auto mod'));
+                        } else {
+                            onProgress(job);
+                            setTimeout(check, interval);
+                        }
+                    })
+                    .catch(error => reject(new Error('Lỗi mạng: ' + error.message)));
+            }
+            check();
+        });
+    }
+    
+    // Update the text under the progress spinner
+    function setProgressText(message) {
+        const progressText = document.getElementById('progressText');
+        if (progressText) {
+            progressText.textContent = message || 'Đang tạo file mod, vui lòng chờ...';
+        }
+    }
+    
     // Initialize keyboard shortcuts
     function initializeKeyboardShortcuts() {
         document.addEventListener('keydown', function(e) {
@@ -426,14 +463,12 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Global functions for file preview and download
     window.previewFile = function(sessionKey, filename) {
-        fetch(`/preview/${sessionKey}`)
+        // Only the requested file's content is sent back
+        fetch(`/preview/${sessionKey}?file=${encodeURIComponent(filename)}`)
             .then(response => response.json())
             .then(data => {
-                if (data.success) {
-                    const file = data.files.find(f => f.name === filename);
-                    if (file) {
-                        showFilePreview(file);
-                    }
+                if (data.success && data.file) {
+                    showFilePreview(data.file);
                 } else {
                     showErrorMessage('Không thể tải file để xem trước');
                 }
@@ -493,7 +528,7 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
             <div class="mb-3">
                 <h6><i class="fas fa-code me-1"></i>Nội dung:</h6>
-                <pre class="bg-light p-3 rounded" style="max-height: 400px; overflow-y: auto;"><code>${file.full_content}</code></pre>
+                <pre class="bg-light p-3 rounded" style="max-height: 400px; overflow-y: auto;"><code>${file.content}</code></pre>
             </div>
         `;
         